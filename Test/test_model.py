@@ -4,6 +4,7 @@ from PySide6.QtGui import QPolygonF
 
 # Assuming model.py is in the same directory or python path
 from model import WarehouseModel
+from enums import PointType
 
 @pytest.fixture
 def fresh_model():
@@ -60,4 +61,29 @@ def test_model_reset(fresh_model, qtbot):
         fresh_model.reset()
     test_model_initial_state(fresh_model) # Should be back to initial state
 
+def test_point_coords_follow_points(fresh_model):
+    fresh_model.add_pick_aisle("A1", QPointF(1, 2))
+    fresh_model.add_pick_aisle("A2", QPointF(3, 4))
+    names, xy = fresh_model.pick_aisle_coords
+    assert names == ["A1", "A2"]
+    assert xy.tolist() == [[1, 2], [3, 4]]
+
+    fresh_model.update_pick_aisle("A1", QPointF(5, 6))
+    fresh_model.remove_pick_aisle("A2")
+    names, xy = fresh_model.pick_aisle_coords
+    assert names == ["A1"]
+    assert xy.tolist() == [[5, 6]]
+
+def test_add_points_bulk_emits_once(fresh_model, qtbot):
+    fresh_model.add_pick_aisle("A1", QPointF(0, 0))
+    emitted = []
+    fresh_model.points_changed.connect(lambda: emitted.append(True))
+    new_points = [("A1", QPointF(1, 1)), ("A2", QPointF(2, 2)), ("A3", QPointF(3, 3))]
+    added, skipped = fresh_model.add_points_bulk(PointType.PICK_AISLE, new_points)
+    assert added == 2
+    assert skipped == 1
+    assert len(emitted) == 1
+    assert fresh_model.pick_aisles["A1"] == QPointF(0, 0) # Existing point kept
+    assert fresh_model.pick_aisle_coords[0] == ["A1", "A2", "A3"]
+
 # ... More tests for other setters, property logic, complex interactions ...
\ No newline at end of file
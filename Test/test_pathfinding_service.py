@@ -5,7 +5,7 @@ from PySide6.QtGui import QPolygonF
 
 from model import WarehouseModel
 from services import PathfindingService # Assuming services.py is accessible
-# from pathfinding import COST_OBSTACLE # If needed for direct grid checks
+from pathfinding import COST_EMPTY, COST_OBSTACLE, create_grid_from_obstacles, dijkstra_precompute, reconstruct_path
 
 @pytest.fixture
 def model_with_pdf_and_scale():
@@ -82,5 +82,32 @@ def test_get_shortest_path_simple(pathfinding_service, model_with_pdf_and_scale,
     assert distance is not None
     assert distance > 0
 
+def test_create_grid_rasterizes_obstacles_and_staging():
+    obstacle = QPolygonF([QPointF(10, 10), QPointF(20, 10), QPointF(20, 20), QPointF(10, 20)])
+    staging_area = QPolygonF([QPointF(40, 10), QPointF(50, 10), QPointF(50, 20), QPointF(40, 20)])
+    grid = create_grid_from_obstacles(61, 40, [obstacle], 1.0, QPointF(0, 0), [staging_area], staging_penalty=5.0)
+    assert grid.shape == (40, 61)
+    assert grid[15, 15] == COST_OBSTACLE
+    assert grid[15, 45] == COST_EMPTY + 5.0
+    assert grid[35, 5] == COST_EMPTY
+    assert grid[35, 60] == COST_EMPTY # Last column is included (rows are padded in the image buffer)
+
+def test_dijkstra_precompute_routes_around_obstacles_and_penalties():
+    grid = np.ones((3, 4), dtype=np.float32)
+    grid[1, 1] = np.inf # Obstacle
+    grid[0, 2] = 10.0 # Staging cell that is cheaper to walk around
+    dist, pred = dijkstra_precompute(grid, (0, 0))
+    assert dist[0, 0] == 0
+    assert np.isinf(dist[1, 1])
+    assert pred[1, 1] == -1
+    assert pred[0, 0] == -1
+    assert dist[0, 3] == 7.0 # Down, along the bottom row and back up avoids the 10.0 cell
+
+    path = reconstruct_path(pred, (0, 0), (0, 3))
+    assert path[0] == (0, 0)
+    assert path[-1] == (0, 3)
+    assert (0, 2) not in path
+    assert len(path) == 8
+
 # ... More tests for obstacles blocking paths, paths through staging areas (penalty), etc.
 # ... Tests for multiprocessing (these are harder, may need to check emitted signals for progress)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import pytest
 import os
 import json
+import numpy as np
 from PySide6.QtCore import QPointF, QRectF
 from PySide6.QtGui import QPolygonF
 
@@ -65,4 +66,28 @@ def test_load_invalid_project(project_service, tmp_path, qtbot):
         loaded_model = project_service.load_project(str(invalid_file))
     assert loaded_model is None
 
+def test_path_data_sidecar_roundtrip(project_service, populated_model, tmp_path):
+    grid = np.ones((4, 5), dtype=np.float32)
+    dist_map = np.arange(20, dtype=np.float64).reshape(4, 5)
+    path_map = np.full((4, 5), -1, dtype=np.int32)
+    path_map[0, 1] = 0 # Flat predecessor indices
+    populated_model.set_pathfinding_data(grid, QPointF(1.0, 2.0), {"A1": dist_map}, {"A1": path_map})
+    file_path = tmp_path / "cached.whp"
+    assert project_service.save_project(populated_model, str(file_path))
+    assert os.path.exists(tmp_path / "cached.paths.npz")
+
+    loaded_model = project_service.load_project(str(file_path))
+    assert loaded_model.path_data_is_valid
+    assert loaded_model.grid_origin_pdf == QPointF(1.0, 2.0)
+    assert np.array_equal(loaded_model.distance_maps["A1"], dist_map)
+    assert np.array_equal(loaded_model.path_maps["A1"], path_map)
+
+    # A layout change invalidates the sidecar
+    with open(file_path) as f:
+        data = json.load(f)
+    data["pick_aisles"]["A1"] = [6, 6]
+    with open(file_path, "w") as f:
+        json.dump(data, f)
+    assert not project_service.load_project(str(file_path)).grid_is_valid
+
 # ... More tests for edge cases, missing fields in JSON, etc. ...
\ No newline at end of file
@@ -49,6 +49,9 @@ class AnalysisResultsDialog(QDialog):
         self.unit = unit
         self.unique_dates = unique_dates
         self.initial_warnings = warnings_list if warnings_list else []
+        # Group rows by their date string once, so switching the date filter is a dict lookup instead of a full scan
+        self._results_by_date: Dict[str, List[Dict[str, Any]]] = {}
+        for res in self.all_detailed_results: self._results_by_date.setdefault(res.get('date'), []).append(res)
 
         self._setup_ui()
         self._update_displays_for_filter()
@@ -103,7 +106,7 @@ class AnalysisResultsDialog(QDialog):
     def _get_filtered_results(self) -> List[Dict[str, Any]]:
         selected_date = self.date_filter_combo.currentText()
         if selected_date == "All Dates": return self.all_detailed_results
-        return [res for res in self.all_detailed_results if res.get('date') == selected_date]
+        return self._results_by_date.get(selected_date, [])
 
     @Slot()
     def _update_displays_for_filter(self):
@@ -15,7 +15,11 @@ from typing import Set, List, Optional
 from enums import AnimationMode
 
 import re
+from functools import lru_cache
 
+_CLUSTER_RE = re.compile(r"([a-zA-Z]+)") # Leading alphabetic run of a point name, compiled once
+
+@lru_cache(maxsize=4096) # Names repeat heavily across picklist rows and dialogs
 def _get_cluster_from_name(name: Optional[str]) -> Optional[str]:
     """
     Extracts the leading alphabetic part of a name as the cluster.
@@ -23,7 +27,7 @@ def _get_cluster_from_name(name: Optional[str]) -> Optional[str]:
     """
     if not name or not isinstance(name, str): # Handle None or non-string inputs
         return None
-    match = re.match(r"([a-zA-Z]+)", name)
+    match = _CLUSTER_RE.match(name)
     return match.group(1).upper() if match else None # Convert to uppercase for consistency
 
 class AnimationControlDialog(QDialog):
@@ -1,11 +1,14 @@
 # --- START OF FILE Warehouse-Path-Finder-main/main.py ---
 
 import sys
-import math
 import multiprocessing
 import time # For timing operations if needed
 from typing import List, Dict, Any, Optional, Tuple # Updated typing imports
 import re
+import os
+import numpy as np
+from collections import OrderedDict
+from functools import lru_cache
 
 # PySide6 imports
 from PySide6.QtWidgets import (
@@ -19,7 +22,7 @@ from PySide6.QtGui import (
     QPolygonF  # <<< QPolygonF MOVED BACK HERE
 )
 from PySide6.QtCore import (
-    Qt, QFileInfo, Signal, Slot, QTimer, QRectF,
+    Qt, Signal, Slot, QTimer, QRectF, QObject, QMetaObject,
     QPointF, QLineF # QPolygonF removed from here
 )
 
@@ -31,21 +34,40 @@ import fitz # For reading PDF metadata (bounds)
 
 # Application-specific refactored modules
 from model import WarehouseModel
-from services import (ProjectService, PathfindingService, AnalysisService, AnimationService)
+from services import (ProjectService, PathfindingService, AnalysisService, AnimationService, AnimationItem)
 from pdf_viewer import PdfViewer, POINT_MARKER_RADIUS # Import constant from PdfViewer
 from enums import InteractionMode, PointType, AnimationMode
 
 # Dialogs
 from line_definition_dialog import LineDefinitionDialog
 from picklist_column_dialog import PicklistColumnDialog
-from analysis_results_dialog import AnalysisResultsDialog
 from animation_picklist_dialog import AnimationPicklistDialog
 from animation_control_dialog import AnimationControlDialog, _get_cluster_from_name
 
 # Set this to True if you need detailed per-frame logs again temporarily
 DEBUG_ANIMATION_VERBOSE = False
 
+# Max number of (start, end) path results kept for repeated "Calculate Path" clicks
+PATH_CACHE_MAX_ENTRIES = 256
+
+# Delay used to coalesce model change signals into a single viewer redraw (~one frame at 60 Hz)
+REDRAW_COALESCE_MS = 16
+
+# Minimum interval between precomputation progress messages in the status bar
+PROGRESS_UPDATE_MIN_INTERVAL_MS = 50
+
+# Name filter shared by the picklist open dialogs (analysis and animation)
+PICKLIST_FILE_FILTER = "CSV (*.csv);;Text (*.txt)"
+
+# Animation tick: base interval, and the ceiling it may stretch to when frames take longer than a tick to draw.
+# Each tick advances the clock by the current interval, so stretching lowers the frame rate but keeps playback speed.
+ANIMATION_TICK_MS = 50 # (50ms = 20 FPS)
+ANIMATION_MAX_TICK_MS = 250
+ANIMATION_COST_EWMA_ALPHA = 0.2 # Weight of the newest frame cost in the running average
+
 # --- Helper function for natural sorting ---
+_NATURAL_SORT_SPLIT_RE = re.compile(r'([0-9]+)')
+
 def natural_sort_key(s: str) -> list:
     """
     Create a sort key for natural string sorting (e.g., A1, A2, A10).
@@ -57,7 +79,49 @@ def natural_sort_key(s: str) -> list:
     # This will split "A10B2" into ['A', 10, 'B', 2]
     # It handles cases like "AA10", "A-10", "A10-B2"
     # The key idea is to convert numeric parts to integers for correct sorting.
-    return [int(text) if text.isdigit() else text.lower() for text in re.split(r'([0-9]+)', s) if text]
+    return [int(text) if text.isdigit() else text.lower() for text in _NATURAL_SORT_SPLIT_RE.split(s) if text]
+
+# --- Path name helpers (pure string ops; QFileInfo would stat the file on every call) ---
+@lru_cache(maxsize=64)
+def _file_name(path: str) -> str: return os.path.basename(path) # Same as QFileInfo.fileName()
+
+@lru_cache(maxsize=64)
+def _base_name(path: str) -> str: return _file_name(path).split(".", 1)[0] # Same as QFileInfo.baseName(): up to the first dot
+
+# --- Integer date keys (yyyymmdd) used to bucket animation items without per-item strftime ---
+def _date_str_to_key(date_str: str) -> int: return int(date_str.replace("-", "")) # "YYYY-MM-DD" -> yyyymmdd
+def _date_key_to_str(key: int) -> str: return f"{key // 10000:04d}-{key // 100 % 100:02d}-{key % 100:02d}"
+
+# --- Helper for evenly spaced coordinates along a line ---
+def _evenly_spaced(start: float, end: float, count: int) -> List[float]:
+    """Returns `count` evenly spaced values from start to end (midpoint if count == 1)."""
+    if count == 1: return [(start + end) / 2]
+    return np.linspace(start, end, count).tolist() # One vectorized pass, plain floats back for QPointF
+
+# --- Animation frame kernels: plain array math over the active items' columns, no Qt objects ---
+def _animation_progress(t: float, start_s: np.ndarray, end_s: np.ndarray) -> np.ndarray:
+    """Fraction of each item's [start, end] elapsed at t, clamped to [0, 1] (1 for zero-length items)."""
+    duration = end_s - start_s
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.clip(np.where(duration > 1e-6, (t - start_s) / duration, 1.0), 0.0, 1.0)
+
+def _cart_poses(progress: np.ndarray, num_points: np.ndarray, path_offsets: np.ndarray, path_xy: np.ndarray,
+                seg_delta: np.ndarray, seg_angle: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Interpolated (K, 2) cart positions and headings in degrees along each item's path (rows path_offsets[k]..+num_points[k])."""
+    idx_float = progress * (num_points - 1)
+    seg_idx = idx_float.astype(np.int64); seg_prog = idx_float - seg_idx
+    seg_idx = np.minimum(seg_idx, num_points - 2) + path_offsets # Absolute row of the segment start
+    # Precomputed per-segment geometry: one gather + multiply-add, no trig; only the K gathered rows are upcast
+    pos = path_xy[seg_idx].astype(np.float64) + seg_delta[seg_idx].astype(np.float64) * seg_prog[:, None]
+    return pos, seg_angle[seg_idx].astype(np.float64)
+
+def _path_line_alphas(t: float, end_s: np.ndarray, visibility_s: float) -> np.ndarray:
+    """255 while an item is running, then a linear fade to 0 over visibility_s after it ends."""
+    alphas = np.full(len(end_s), 255)
+    if visibility_s > 1e-6:
+        fading = t > end_s
+        alphas[fading] = (255 * (1.0 - np.clip((t - end_s[fading]) / visibility_s, 0.0, 1.0))).astype(np.int64)
+    return alphas
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -83,17 +147,40 @@ class MainWindow(QMainWindow):
 
         # Animation related
         self.animation_timer = QTimer(self)
-        self.animation_timer.setInterval(50) # (50ms = 20 FPS)
+        self.animation_timer.setInterval(ANIMATION_TICK_MS)
+        self._anim_tick_seconds: float = self.animation_timer.interval() / 1000.0 # Re-read only when the interval changes
+        self._anim_cost_ewma_ms: float = 0.0 # Running average of the time one tick takes to draw
         self.animation_control_dialog: Optional[AnimationControlDialog] = None
+        self._anim_dialog_conns: List[QMetaObject.Connection] = [] # Handles of the dialog's signal connections, disconnected on close
         self.current_animation_time_s: float = 0.0
         self.animation_speed_multiplier: float = 1.0
-        self._animation_data_prepared: List[Dict[str, Any]] = []
+        self._animation_data_prepared: List[AnimationItem] = []
         self._animation_earliest_dt_prepared: Optional[datetime] = None # Correct type hint
+        # Per-item column arrays parallel to _animation_data_prepared (built once per prepared data set)
+        self._anim_start_s: np.ndarray = np.empty(0, dtype=np.float64)
+        self._anim_end_s: np.ndarray = np.empty(0, dtype=np.float64)
+        self._anim_start_ts: np.ndarray = np.empty(0, dtype=np.float64) # start_dt as POSIX timestamp
+        self._anim_date_ord: np.ndarray = np.empty(0, dtype=np.int32)   # start_dt date as yyyymmdd
+        self._anim_num_points: np.ndarray = np.empty(0, dtype=np.int32) # len(path_points)
+        self._anim_path_xy: np.ndarray = np.empty((0, 2), dtype=np.float32) # All items' path points, concatenated (float32 is ample for PDF coords)
+        self._anim_path_offsets: np.ndarray = np.zeros(1, dtype=np.int64)  # Item i's points are _anim_path_xy[offsets[i]:offsets[i+1]]
+        self._anim_seg_delta: np.ndarray = np.empty((0, 2), dtype=np.float32) # Row r: xy[r+1] - xy[r] (the segment starting at point r)
+        self._anim_seg_angle: np.ndarray = np.empty(0, dtype=np.float32)      # Row r: heading of that segment in degrees
+        self._anim_path_bbox: np.ndarray = np.empty((0, 4), dtype=np.float32)  # Per item: min x, min y, max x, max y of its path
+        self._anim_by_start: np.ndarray = np.empty(0, dtype=np.intp)    # All item indices sorted by start_time_s
+        self._anim_date_buckets: Dict[int, np.ndarray] = {} # yyyymmdd -> item indices sorted by start_time_s
+        self._anim_cluster_names: List[Optional[str]] = [None]           # Interned cluster names; index = cluster id
+        self._anim_start_cluster_id: np.ndarray = np.empty(0, dtype=np.int32)
+        self._anim_end_cluster_id: np.ndarray = np.empty(0, dtype=np.int32)
+        # Filtered items sorted by start, their start times and max duration; None until built for the current filters
+        self._anim_filtered_order: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, float]] = None
+        self._anim_cart_size_px: Optional[Tuple[float, float]] = None # (width, length) in pixels; None until derived for the current scale/cart size
         self._animation_mode_current = AnimationMode.CARTS
         self._path_visibility_duration_s_current = 300
         self._keep_paths_visible_current = False
-        self._animation_active_start_clusters: set[str] = set()
-        self._animation_active_end_clusters: set[str] = set()
+        self._animation_active_start_clusters: frozenset[str] = frozenset()
+        self._animation_active_end_clusters: frozenset[str] = frozenset()
+        self._last_animation_filter_key: Optional[Tuple[str, Tuple[str, ...], Tuple[str, ...]]] = None # (date, start clusters, end clusters) last applied
         self._animation_selected_date_filter: str = "All Dates" # Default
         self._filtered_min_time_s: Optional[float] = None
         self._filtered_max_time_s: Optional[float] = None
@@ -105,6 +192,36 @@ class MainWindow(QMainWindow):
         self._last_analysis_unit: Optional[str] = None
         self._last_analysis_input_filename: Optional[str] = None
 
+        # Precomputation progress throttling (status bar repaints are capped, the final count always shows)
+        self._precompute_expected_total: int = 0
+        self._last_progress_ms: float = 0.0
+
+        # Connection handles for the current model's signals, used to disconnect when the model is replaced
+        self._model_conns: List[QMetaObject.Connection] = []
+        self._last_action_state: Optional[Tuple[bool, ...]] = None # Inputs _update_action_states last applied
+
+        # File name of the running analysis/animation job, resolved once when the job starts
+        self._current_job_file_name: str = ""
+        # Picklist open dialog, built on first use and reused by analysis and animation (also keeps the last folder)
+        self._picklist_file_dialog: Optional[QFileDialog] = None
+
+        # Maps the uid stored in a polygon item's data(0) -> (kind, model polygon) for O(1) edit/delete lookups
+        self._polygon_by_uid: Dict[int, Tuple[str, QPolygonF]] = {}
+        # LRU cache of single-path results: (start_name, end_name) -> (path_points, distance)
+        self._path_cache: "OrderedDict[Tuple[str, str], Tuple[Optional[List[QPointF]], Optional[float]]]" = OrderedDict()
+        # Key sets the start/end combos were last filled from; _update_comboboxes skips the sort + rebuild while unchanged
+        self._start_combo_keys: Optional[frozenset] = None; self._end_combo_keys: Optional[frozenset] = None # None: first refresh always runs
+        # Coalesces bursts of layout/points signals (e.g. line-generated points) into one redraw per frame
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setSingleShot(True)
+        self._redraw_timer.setInterval(REDRAW_COALESCE_MS)
+        self._redraw_timer.timeout.connect(self._redraw_viewer_from_model)
+        # Collapses cascaded model signals (e.g. project load) into one UI state refresh once the event loop drains
+        self._ui_state_timer = QTimer(self)
+        self._ui_state_timer.setSingleShot(True)
+        self._ui_state_timer.setInterval(0)
+        self._ui_state_timer.timeout.connect(self._update_all_ui_states)
+
         self._setup_ui()
         self._connect_signals()
         self._update_all_ui_states()
@@ -190,16 +307,7 @@ class MainWindow(QMainWindow):
 
     def _connect_signals(self):
         # Model Signals
-        self.model.pdf_path_changed.connect(self._handle_pdf_loaded_in_model)
-        self.model.scale_changed.connect(self._handle_scale_changed_in_model)
-        self.model.layout_changed.connect(self._handle_layout_or_points_changed_in_model)
-        self.model.points_changed.connect(self._handle_layout_or_points_changed_in_model)
-        self.model.grid_parameters_changed.connect(self._handle_grid_params_changed_in_model)
-        self.model.project_loaded.connect(self._handle_project_loaded_in_model)
-        self.model.model_reset.connect(self._handle_model_reset)
-        self.model.grid_invalidated.connect(self._handle_grid_invalidated_in_model)
-        self.model.cart_dimensions_changed.connect(self._handle_cart_dimensions_changed_in_model)
-        self.model.save_state_changed.connect(self._update_action_states)
+        self._connect_model_signals()
 
         # PdfViewer Signals
         self.pdf_viewer.scale_line_drawn.connect(self._handle_scale_line_drawn)
@@ -216,15 +324,15 @@ class MainWindow(QMainWindow):
         self.project_service.project_save_failed.connect(lambda err: QMessageBox.critical(self, "Save Error", err))
         self.pathfinding_service.grid_update_started.connect(lambda: self.statusBar().showMessage("Updating grid...", 0))
         self.pathfinding_service.grid_update_finished.connect(self._handle_grid_update_finished)
-        self.pathfinding_service.precomputation_started.connect(lambda count: self.statusBar().showMessage(f"Precomputing paths for {count} points...", 0))
-        self.pathfinding_service.precomputation_progress.connect(lambda done, name: self.statusBar().showMessage(f"Precomputed {done} paths (current: {name})...", 0))
+        self.pathfinding_service.precomputation_started.connect(self._handle_precomputation_started)
+        self.pathfinding_service.precomputation_progress.connect(self._handle_precomputation_progress)
         self.pathfinding_service.precomputation_finished.connect(self._handle_precomputation_finished)
-        self.analysis_service.analysis_started.connect(lambda fp: self.statusBar().showMessage(f"Analyzing: {QFileInfo(fp).fileName()}...", 0))
+        self.analysis_service.analysis_started.connect(self._handle_analysis_started)
         self.analysis_service.analysis_complete.connect(self._handle_analysis_complete)
         self.analysis_service.analysis_failed.connect(lambda err: QMessageBox.critical(self, "Analysis Error", err))
         self.analysis_service.export_complete.connect(lambda fp: QMessageBox.information(self, "Export Successful", f"Results exported to {fp}"))
         self.analysis_service.export_failed.connect(lambda err: QMessageBox.critical(self, "Export Error", err))
-        self.animation_service.preparation_started.connect(lambda fp: self.statusBar().showMessage(f"Preparing animation: {QFileInfo(fp).fileName()}...",0))
+        self.animation_service.preparation_started.connect(self._handle_animation_preparation_started)
         self.animation_service.preparation_complete.connect(self._handle_animation_data_prepared)
         self.animation_service.preparation_failed.connect(lambda err: QMessageBox.critical(self, "Animation Prep Error", err))
         self.animation_service.preparation_warning.connect(lambda warn: QMessageBox.warning(self, "Animation Prep Warning", warn))
@@ -259,8 +367,9 @@ class MainWindow(QMainWindow):
     @Slot()
     def _handle_model_reset(self):
         print("[MainWindow] Model has been reset.")
+        self._invalidate_path_cache(); self._anim_cart_size_px = None
         self.pdf_viewer._clear_scene_items(clear_pdf=True)
-        self._update_all_ui_states()
+        self._schedule_ui_state_update()
         self.statusBar().showMessage("Model reset. Open a PDF or Project.")
         self.setWindowTitle("Warehouse Path Finder")
         self._last_analysis_detailed_results = None; self._last_analysis_warnings = None
@@ -281,41 +390,56 @@ class MainWindow(QMainWindow):
                 self.model.reset()
         elif not pdf_path: # Model was reset, pdf_path is None
              self.pdf_viewer._clear_scene_items(clear_pdf=True)
-        self._update_all_ui_states(); self._update_window_title()
+        self._schedule_ui_state_update(); self._update_window_title()
 
     @Slot(float, str, str)
     def _handle_scale_changed_in_model(self, pixels_per_unit, calib_unit, disp_unit):
+        self._invalidate_path_cache() # Cached distances are in the previous display unit
+        self._anim_cart_size_px = None
         self.statusBar().showMessage(f"Scale: {pixels_per_unit:.2f} px/{calib_unit}. Display: {disp_unit}. Ready for layout.", 5000)
-        self._update_all_ui_states() # Updates granularity label and action states
+        self._schedule_ui_state_update() # Updates granularity label and action states
 
     @Slot()
     def _handle_layout_or_points_changed_in_model(self):
-        print("[MainWindow] Model layout or points changed. Redrawing viewer.")
-        self._redraw_viewer_from_model()
-        self._update_all_ui_states()
+        self._invalidate_path_cache()
+        self._redraw_timer.start() # Restarting an active single-shot timer keeps one pending redraw
+        self._schedule_ui_state_update()
 
     def _redraw_viewer_from_model(self):
         """Clears and redraws all model-managed items in the PdfViewer."""
-        self.pdf_viewer.clear_obstacles()
-        for obs_poly in self.model.obstacles: self.pdf_viewer.add_obstacle_item(obs_poly)
-        self.pdf_viewer.clear_staging_areas()
-        for sa_poly in self.model.staging_areas: self.pdf_viewer.add_staging_area_item(sa_poly)
-        self.pdf_viewer.clear_all_points()
-        for name, pos in self.model.pick_aisles.items(): self.pdf_viewer.add_pick_aisle_item(name, pos)
-        for name, pos in self.model.staging_locations.items(): self.pdf_viewer.add_staging_location_item(name, pos)
-        self.pdf_viewer.clear_path() # Clear any old path if layout changed
-        # --- ADD BOUNDS DRAWING ---
-        self.pdf_viewer.draw_pathfinding_bounds_item(self.model.user_pathfinding_bounds)        
+        self._redraw_timer.stop() # Any pending coalesced redraw is satisfied by this one
+        print("[MainWindow] Redrawing viewer from model.")
+        # Suspend viewport repaints while items are rebuilt; one full repaint at the end instead of per-item invalidation
+        self.pdf_viewer.setUpdatesEnabled(False)
+        try:
+            self._polygon_by_uid.clear()
+            self.pdf_viewer.clear_obstacles()
+            for obs_poly in self.model.obstacles:
+                item = self.pdf_viewer.add_obstacle_item(obs_poly); self._polygon_by_uid[item.data(0)["uid"]] = ("obstacle", obs_poly)
+            self.pdf_viewer.clear_staging_areas()
+            for sa_poly in self.model.staging_areas:
+                item = self.pdf_viewer.add_staging_area_item(sa_poly); self._polygon_by_uid[item.data(0)["uid"]] = ("staging", sa_poly)
+            self.pdf_viewer.clear_all_points()
+            for name, pos in self.model.pick_aisles.items(): self.pdf_viewer.add_pick_aisle_item(name, pos)
+            for name, pos in self.model.staging_locations.items(): self.pdf_viewer.add_staging_location_item(name, pos)
+            self.pdf_viewer.clear_path() # Clear any old path if layout changed
+            # --- ADD BOUNDS DRAWING ---
+            self.pdf_viewer.draw_pathfinding_bounds_item(self.model.user_pathfinding_bounds)
+        finally:
+            self.pdf_viewer.setUpdatesEnabled(True)
+            self.pdf_viewer.viewport().update()
 
     @Slot()
     def _handle_grid_params_changed_in_model(self):
+        self._invalidate_path_cache() # Emitted when new grid/path maps are stored
         self._update_spinbox_values_from_model() # Ensure UI reflects model
         self._update_granularity_label()
-        self._update_all_ui_states() # Actions might depend on this
+        self._schedule_ui_state_update() # Actions might depend on this
 
     @Slot()
     def _handle_project_loaded_in_model(self):
         print("[MainWindow] Project loaded in model. Updating UI.")
+        self._invalidate_path_cache()
         if self.model.current_pdf_path:
             success, bounds = self.pdf_viewer.load_pdf(self.model.current_pdf_path)
             if success and bounds:
@@ -325,18 +449,20 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Project Load", f"Could not load associated PDF: {self.model.current_pdf_path}")
         else: self.pdf_viewer._clear_scene_items(clear_pdf=True)
         self._redraw_viewer_from_model()
-        self.statusBar().showMessage(f"Project '{QFileInfo(self.model.current_project_path).fileName()}' loaded.", 5000)
-        self._update_window_title(); self._update_all_ui_states()
+        self.statusBar().showMessage(f"Project '{_file_name(self.model.current_project_path)}' loaded.", 5000)
+        self._update_window_title(); self._schedule_ui_state_update()
 
     @Slot()
     def _handle_grid_invalidated_in_model(self):
         print("[MainWindow] Model grid invalidated. Clearing visual path.")
+        self._invalidate_path_cache()
         self.pdf_viewer.clear_path()
         self.statusBar().showMessage("Path data is stale. Re-calculate or Precompute.", 3000)
-        self._update_all_ui_states()
+        self._schedule_ui_state_update()
 
     @Slot(float, float)
     def _handle_cart_dimensions_changed_in_model(self, width: float, length: float):
+        self._anim_cart_size_px = None
         if self.animation_control_dialog:
             self.animation_control_dialog.cart_width_spinbox.setValue(width)
             self.animation_control_dialog.cart_length_spinbox.setValue(length)
@@ -346,15 +472,18 @@ class MainWindow(QMainWindow):
     def _handle_scale_line_drawn(self, p1: QPointF, p2: QPointF):
         print(f"[MainWindow] _handle_scale_line_drawn called with p1: {p1}, p2: {p2}") # Debug print
 
-        pixel_dist = math.dist(p1.toTuple(), p2.toTuple())
-        print(f"[MainWindow] Calculated pixel_dist: {pixel_dist}") # Debug print
+        line = QLineF(p1, p2); dx, dy = line.dx(), line.dy()
+        dist_sq = dx*dx + dy*dy # Squared length is enough for the degenerate-line check
 
-        if pixel_dist < 1e-6:
+        if dist_sq < 1e-12:
             self.statusBar().showMessage("Scale line too short. Please try again.", 3000)
             print("[MainWindow] Scale line too short, re-entering SET_SCALE_START mode.") # Debug print
             self.pdf_viewer.set_mode(InteractionMode.SET_SCALE_START)
             return
 
+        pixel_dist = line.length() # Computed natively by Qt
+        print(f"[MainWindow] Calculated pixel_dist: {pixel_dist}") # Debug print
+
         unit_to_use = self.model.display_unit
         print(f"[MainWindow] Showing QInputDialog for scale with unit: {unit_to_use}") # Debug print
 
@@ -428,31 +557,39 @@ class MainWindow(QMainWindow):
         confirm = QMessageBox.question(self, "Confirm Deletion", f"Delete {len(items_to_delete_refs)} selected item(s)?",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
         if confirm == QMessageBox.StandardButton.No: self.pdf_viewer.scene().clearSelection(); return
-        deleted_count = 0
+        # Resolve every selected item to its model object BEFORE mutating the model:
+        # each removal triggers a viewer redraw that replaces the graphics items.
+        polygons_to_remove, points_to_remove = [], []
         for item_ref in items_to_delete_refs:
-            # Find by reference in PdfViewer's internal lists to get the model's polygon
-            # This assumes PdfViewer's lists accurately mirror model's polygons' graphics items
-            found_in_model = False
-            for i, viewer_item in enumerate(self.pdf_viewer._obstacle_items):
-                if viewer_item is item_ref:
-                    if i < len(self.model.obstacles): self.model.remove_obstacle_by_ref(self.model.obstacles[i]); deleted_count+=1; found_in_model=True
-                    break
-            if found_in_model: continue
-            for i, viewer_item in enumerate(self.pdf_viewer._staging_area_items):
-                if viewer_item is item_ref:
-                    if i < len(self.model.staging_areas): self.model.remove_staging_area_by_ref(self.model.staging_areas[i]); deleted_count+=1; found_in_model=True
-                    break
-            if found_in_model: continue
-
+            mapped = self._model_polygon_for_item(item_ref)
+            if mapped: polygons_to_remove.append(mapped); continue
             item_data = item_ref.data(0) # For points
             if item_data and isinstance(item_data, dict):
                 name, pt_type_str = item_data.get("name"), item_data.get("type")
-                if name and pt_type_str:
-                    if pt_type_str == PointType.PICK_AISLE.value and self.model.remove_pick_aisle(name): deleted_count +=1
-                    elif pt_type_str == PointType.STAGING_LOCATION.value and self.model.remove_staging_location(name): deleted_count +=1
+                if name and pt_type_str: points_to_remove.append((pt_type_str, name))
+        deleted_count = 0
+        for kind, polygon_ref in polygons_to_remove:
+            if kind == "obstacle": self.model.remove_obstacle_by_ref(polygon_ref); deleted_count += 1
+            elif kind == "staging": self.model.remove_staging_area_by_ref(polygon_ref); deleted_count += 1
+        for pt_type_str, name in points_to_remove:
+            if pt_type_str == PointType.PICK_AISLE.value and self.model.remove_pick_aisle(name): deleted_count +=1
+            elif pt_type_str == PointType.STAGING_LOCATION.value and self.model.remove_staging_location(name): deleted_count +=1
         if deleted_count > 0: self.statusBar().showMessage(f"Deleted {deleted_count} item(s).", 3000)
         self.pdf_viewer.scene().clearSelection()
 
+    def _model_polygon_for_item(self, item: QGraphicsItem) -> Optional[Tuple[str, QPolygonF]]:
+        """Returns (kind, model polygon) for an obstacle/staging graphics item, or None."""
+        item_data = item.data(0)
+        if not (isinstance(item_data, dict) and "uid" in item_data): return None
+        mapped = self._polygon_by_uid.get(item_data["uid"])
+        if mapped and self._redraw_timer.isActive():
+            # A coalesced redraw is pending, so the map may still describe the previous layout: only trust it if the model holds that polygon
+            kind, polygon_ref = mapped; model_polygons = self.model.obstacles if kind == "obstacle" else self.model.staging_areas
+            if not any(p is polygon_ref for p in model_polygons):
+                self._redraw_viewer_from_model(); print(f"[MainWindow] Warn: Item {item} belongs to a replaced layout; viewer redrawn.")
+                return None
+        return mapped
+
     @Slot(QGraphicsItem, object) # object can be QPolygonF or QPointF
     def _handle_item_moved_in_edit(self, moved_item: QGraphicsItem, new_geometry: Any):
         item_updated_in_model = False
@@ -460,17 +597,12 @@ class MainWindow(QMainWindow):
         # Using item.data(0) to store unique ID/name is best.
         item_data = moved_item.data(0) # Assume points have data set
         if isinstance(new_geometry, QPolygonF): # Obstacle or Staging Area
-            # Try to find by reference in viewer's lists to update corresponding model polygon
-            # This needs a more robust mapping strategy (e.g., unique IDs)
-            for i, obs_item in enumerate(self.pdf_viewer._obstacle_items):
-                if obs_item is moved_item:
-                    if i < len(self.model.obstacles): self.model.update_obstacle(self.model.obstacles[i], new_geometry); item_updated_in_model = True
-                    break
-            if not item_updated_in_model:
-                for i, sa_item in enumerate(self.pdf_viewer._staging_area_items):
-                    if sa_item is moved_item:
-                        if i < len(self.model.staging_areas): self.model.update_staging_area(self.model.staging_areas[i], new_geometry); item_updated_in_model = True
-                        break
+            mapped = self._model_polygon_for_item(moved_item)
+            if mapped:
+                kind, polygon_ref = mapped
+                if kind == "obstacle": self.model.update_obstacle(polygon_ref, new_geometry); item_updated_in_model = True
+                elif kind == "staging": self.model.update_staging_area(polygon_ref, new_geometry); item_updated_in_model = True
+                if item_updated_in_model: self._polygon_by_uid[item_data["uid"]] = (kind, new_geometry) # Model now holds new_geometry; keep the map valid until the redraw
         elif isinstance(new_geometry, QPointF) and item_data and isinstance(item_data, dict): # Point
             name, pt_type_str = item_data.get("name"), item_data.get("type")
             if name and pt_type_str:
@@ -490,7 +622,7 @@ class MainWindow(QMainWindow):
             try:
                 temp_doc = fitz.open(file_path) # fitz should be imported
                 if temp_doc.page_count > 0:
-                    page = temp_doc.load_page(0); rect = page.rect
+                    rect = temp_doc[0].rect # Honours /Rotate (page_cropbox doesn't); the content stream is not parsed here
                     pdf_bounds = QRectF(rect.x0, rect.y0, rect.width, rect.height)
                     self.model.set_pdf_path_and_bounds(file_path, pdf_bounds) # This will trigger model_reset then pdf_path_changed
                 else: QMessageBox.warning(self, "PDF Error", "PDF has no pages.")
@@ -501,39 +633,30 @@ class MainWindow(QMainWindow):
 
     def _disconnect_model_signals(self):
         """Helper to disconnect signals from the current self.model instance."""
-        if self.model: # Check if a model exists
-            try:
-                self.model.pdf_path_changed.disconnect(self._handle_pdf_loaded_in_model)
-                self.model.scale_changed.disconnect(self._handle_scale_changed_in_model)
-                self.model.layout_changed.disconnect(self._handle_layout_or_points_changed_in_model)
-                self.model.points_changed.disconnect(self._handle_layout_or_points_changed_in_model)
-                self.model.grid_parameters_changed.disconnect(self._handle_grid_params_changed_in_model)
-                self.model.project_loaded.disconnect(self._handle_project_loaded_in_model)
-                self.model.model_reset.disconnect(self._handle_model_reset)
-                self.model.grid_invalidated.disconnect(self._handle_grid_invalidated_in_model)
-                self.model.cart_dimensions_changed.disconnect(self._handle_cart_dimensions_changed_in_model)
-                self.model.save_state_changed.disconnect(self._update_action_states) # Was _update_save_actions_state
-                print("[MainWindow] Disconnected signals from old model.")
-            except RuntimeError as e:
-                # This can happen if signals were never connected or already disconnected
-                print(f"[MainWindow] Info: Error disconnecting model signals (might be normal): {e}")
-            except AttributeError as e:
-                 print(f"[MainWindow] Info: AttributeError disconnecting model signals (model might be incomplete): {e}")
+        # Disconnect by the handles saved at connect time (no per-slot lookup, and only what we actually connected)
+        for conn in self._model_conns:
+            try: QObject.disconnect(conn)
+            except RuntimeError as e: print(f"[MainWindow] Info: Error disconnecting model signal (might be normal): {e}")
+        if self._model_conns: print("[MainWindow] Disconnected signals from old model.")
+        self._model_conns.clear()
 
 
     def _connect_model_signals(self):
         """Helper to connect signals to the current self.model instance."""
         if self.model: # Check if a model exists
-            self.model.pdf_path_changed.connect(self._handle_pdf_loaded_in_model)
-            self.model.scale_changed.connect(self._handle_scale_changed_in_model)
-            self.model.layout_changed.connect(self._handle_layout_or_points_changed_in_model)
-            self.model.points_changed.connect(self._handle_layout_or_points_changed_in_model)
-            self.model.grid_parameters_changed.connect(self._handle_grid_params_changed_in_model)
-            self.model.project_loaded.connect(self._handle_project_loaded_in_model)
-            self.model.model_reset.connect(self._handle_model_reset)
-            self.model.grid_invalidated.connect(self._handle_grid_invalidated_in_model)
-            self.model.cart_dimensions_changed.connect(self._handle_cart_dimensions_changed_in_model)
-            self.model.save_state_changed.connect(self._update_action_states)
+            self._anim_cart_size_px = None # Derived from the previous model's scale/cart size
+            self._model_conns = [
+                self.model.pdf_path_changed.connect(self._handle_pdf_loaded_in_model),
+                self.model.scale_changed.connect(self._handle_scale_changed_in_model),
+                self.model.layout_changed.connect(self._handle_layout_or_points_changed_in_model),
+                self.model.points_changed.connect(self._handle_layout_or_points_changed_in_model),
+                self.model.grid_parameters_changed.connect(self._handle_grid_params_changed_in_model),
+                self.model.project_loaded.connect(self._handle_project_loaded_in_model),
+                self.model.model_reset.connect(self._handle_model_reset),
+                self.model.grid_invalidated.connect(self._handle_grid_invalidated_in_model),
+                self.model.cart_dimensions_changed.connect(self._handle_cart_dimensions_changed_in_model),
+                self.model.save_state_changed.connect(self._update_action_states),
+            ]
             print("[MainWindow] Connected signals to new model.")
 
     @Slot()
@@ -553,17 +676,12 @@ class MainWindow(QMainWindow):
                 
                 self.model = loaded_model  # Replace current model with the newly loaded one
                 self.model.setParent(self) # Ensure proper Qt object ownership if model is a QObject
+                self._connect_model_signals() # Connect signals to the new model instance
 
-                # Connect signals to the new model instance
-                self._connect_model_signals()
-                
-                # Manually trigger project_loaded handling sequence for the new model.
-                # The model.mark_project_loaded() in ProjectService will emit project_loaded,
-                # which _handle_project_loaded_in_model will catch.
-                # However, we might need to explicitly call some UI updates if the model instance truly changed.
+                # The loader's project_loaded was emitted before we connected, so run the one full refresh explicitly
                 self._handle_project_loaded_in_model() # This will refresh viewer and UI states
                 
-                self.statusBar().showMessage(f"Project '{QFileInfo(file_path).fileName()}' loaded successfully.", 5000)
+                self.statusBar().showMessage(f"Project '{_file_name(file_path)}' loaded successfully.", 5000)
             # If loaded_model is None, project_service would have emitted project_load_failed signal
             # and MainWindow's slot for that signal would show an error message.
         else:
@@ -576,7 +694,7 @@ class MainWindow(QMainWindow):
 
     def _handle_save_project_as_action(self):
         if not self.model.is_saveable: QMessageBox.warning(self, "Save", "No data to save."); return
-        sugg_name = (QFileInfo(self.model.current_pdf_path).baseName() if self.model.current_pdf_path else "untitled") + ".whp"
+        sugg_name = (_base_name(self.model.current_pdf_path) if self.model.current_pdf_path else "untitled") + ".whp"
         file_path, _ = QFileDialog.getSaveFileName(self, "Save Project As", sugg_name, "Warehouse Project Files (*.whp)")
         if file_path:
             if self.project_service.save_project(self.model, file_path):
@@ -590,32 +708,23 @@ class MainWindow(QMainWindow):
 
 
     def _generate_points_on_line_from_model(self, point_type: PointType, cluster: str, start_num: int, end_num: int, p1: QPointF, p2: QPointF):
-        # ... (logic as before, calling self.model.add_pick_aisle or self.model.add_staging_location)
-        added_count, duplicates_skipped = 0, 0
+        # Build all (name, position) pairs first, then hand them to the model in one call (one points_changed emit)
+        new_points: List[Tuple[str, QPointF]] = []
         total_points_in_range = (end_num - start_num) + 1
         if point_type == PointType.PICK_AISLE:
             x, y_s, y_e = (p1.x()+p2.x())/2, min(p1.y(),p2.y()), max(p1.y(),p2.y())
             num_pairs = (total_points_in_range + 1) // 2; current_val = start_num
             if num_pairs < 1: return
-            spacing = (y_e - y_s) / max(1, num_pairs - 1) if num_pairs > 1 else 0
-            for i in range(num_pairs):
-                y = y_s + i * spacing if num_pairs > 1 else (y_s + y_e) / 2
-                for j in range(2):
-                    if current_val + j <= end_num:
-                        name = f"{cluster}{current_val + j}"
-                        if self.model.add_pick_aisle(name, QPointF(x,y)): added_count += 1
-                        else: duplicates_skipped += 1
+            for y in _evenly_spaced(y_s, y_e, num_pairs):
+                for j in range(2): # Aisle numbers come in facing pairs at the same y
+                    if current_val + j <= end_num: new_points.append((f"{cluster}{current_val + j}", QPointF(x,y)))
                 current_val += 2
         elif point_type == PointType.STAGING_LOCATION:
             y, x_s, x_e = (p1.y()+p2.y())/2, min(p1.x(),p2.x()), max(p1.x(),p2.x())
             num_points = total_points_in_range
             if num_points < 1: return
-            spacing = (x_e - x_s) / max(1, num_points - 1) if num_points > 1 else 0
-            for i in range(num_points):
-                x = x_s + i * spacing if num_points > 1 else (x_s + x_e) / 2
-                name = f"{cluster}{start_num + i}"
-                if self.model.add_staging_location(name, QPointF(x,y)): added_count +=1
-                else: duplicates_skipped +=1
+            new_points = [(f"{cluster}{start_num + i}", QPointF(x,y)) for i, x in enumerate(_evenly_spaced(x_s, x_e, num_points))]
+        added_count, duplicates_skipped = self.model.add_points_bulk(point_type, new_points)
         msg = f"Added {added_count} {point_type.value}(s)."; msg += f" Skipped {duplicates_skipped} duplicates." if duplicates_skipped else ""
         self.statusBar().showMessage(msg, 3000)
 
@@ -627,9 +736,28 @@ class MainWindow(QMainWindow):
         if not self.model.grid_is_valid or start_n not in self.model.path_maps:
             QMessageBox.information(self, "Info", f"Path data for '{start_n}' needs precomputation. Run Tools > Precompute All Paths."); return
 
-        self.statusBar().showMessage(f"Calculating path: {start_n} to {end_n}...", 0)
-        QApplication.processEvents()
+        cache_key = (start_n, end_n)
+        if cache_key in self._path_cache:
+            self._path_cache.move_to_end(cache_key)
+            path_pts, dist = self._path_cache[cache_key]
+        else:
+            self.statusBar().showMessage(f"Calculating path: {start_n} to {end_n}...", 0)
+            QTimer.singleShot(0, lambda: self._do_path_calc(start_n, end_n)) # Lets the status message paint before the lookup blocks
+            return
+        self._show_single_path(start_n, end_n, path_pts, dist)
+
+    def _do_path_calc(self, start_n: str, end_n: str):
+        if not self.model.grid_is_valid or start_n not in self.model.path_maps: # Data changed before the continuation ran
+            self.statusBar().showMessage("Path data is stale. Re-calculate or Precompute.", 3000); return
         path_pts, dist = self.pathfinding_service.get_shortest_path(self.model, start_n, end_n)
+        self._path_cache[(start_n, end_n)] = (path_pts, dist)
+        if len(self._path_cache) > PATH_CACHE_MAX_ENTRIES: self._path_cache.popitem(last=False)
+        self._show_single_path(start_n, end_n, path_pts, dist)
+
+    def _invalidate_path_cache(self):
+        self._path_cache.clear()
+
+    def _show_single_path(self, start_n: str, end_n: str, path_pts: Optional[List[QPointF]], dist: Optional[float]):
         self.pdf_viewer.draw_path(path_pts)
 
         if path_pts and dist is not None:
@@ -666,7 +794,7 @@ class MainWindow(QMainWindow):
     def _trigger_picklist_analysis(self):
         # ... (Logic remains similar, calls self.analysis_service.load_and_analyze) ...
         if not self.model.can_analyze_or_animate: QMessageBox.warning(self, "Analyze", "Set PDF, scale, points & precompute paths."); return
-        fp, _ = QFileDialog.getOpenFileName(self, "Open Picklist for Analysis", "", "CSV (*.csv);;Text (*.txt)")
+        fp = self._ask_picklist_path("Open Picklist for Analysis")
         if not fp: self.statusBar().showMessage("Analysis cancelled."); return
         try:
             dlg = PicklistColumnDialog(fp, self)
@@ -675,10 +803,20 @@ class MainWindow(QMainWindow):
         except RuntimeError as e: QMessageBox.critical(self, "File Error", f"Cannot process picklist preview: {e}")
 
 
+    def _ask_picklist_path(self, title: str) -> str:
+        """Runs the shared picklist open dialog; returns the chosen path or "" if cancelled."""
+        if self._picklist_file_dialog is None:
+            self._picklist_file_dialog = QFileDialog(self, title, "", PICKLIST_FILE_FILTER)
+            self._picklist_file_dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptOpen)
+            self._picklist_file_dialog.setFileMode(QFileDialog.FileMode.ExistingFile)
+        dlg = self._picklist_file_dialog; dlg.setWindowTitle(title)
+        return dlg.selectedFiles()[0] if dlg.exec() and dlg.selectedFiles() else ""
+
     def _view_last_analysis_results_dialog(self):
         # ... (Logic remains similar, instantiates AnalysisResultsDialog with cached data) ...
         if not self._last_analysis_detailed_results: QMessageBox.information(self, "View Results", "No analysis results."); return
         dates = sorted(list(set(r.get('date','') for r in self._last_analysis_detailed_results if r.get('date'))))
+        from analysis_results_dialog import AnalysisResultsDialog # Deferred: pulls in matplotlib/pandas, which dominate startup time
         dlg = AnalysisResultsDialog(self._last_analysis_input_filename or "N/A", self._last_analysis_warnings,
                                    self._last_analysis_detailed_results, self._last_analysis_unit or self.model.display_unit, dates, self)
         dlg.export_filtered_requested.connect(self._export_filtered_analysis_data)
@@ -687,14 +825,14 @@ class MainWindow(QMainWindow):
     def _export_last_analysis_results_dialog(self): # Renamed from _export_last_analysis_results
         if not self._last_analysis_detailed_results: QMessageBox.information(self, "Export", "No results to export."); return
         default_name = "analysis_results.csv"
-        if self._last_analysis_input_filename: default_name = f"{QFileInfo(self._last_analysis_input_filename).baseName()}_analysis.csv"
+        if self._last_analysis_input_filename: default_name = f"{_base_name(self._last_analysis_input_filename)}_analysis.csv"
         fp, _ = QFileDialog.getSaveFileName(self, "Export Analysis", default_name, "CSV (*.csv)")
         if fp: self.analysis_service.export_results(self._last_analysis_detailed_results, self._last_analysis_unit or self.model.display_unit, fp)
 
     @Slot(list, str) # Slot for the signal from AnalysisResultsDialog
     def _export_filtered_analysis_data(self, filtered_results: list, unit: str):
         default_name = "filtered_analysis_results.csv"
-        if self._last_analysis_input_filename: default_name = f"{QFileInfo(self._last_analysis_input_filename).baseName()}_filtered_analysis.csv"
+        if self._last_analysis_input_filename: default_name = f"{_base_name(self._last_analysis_input_filename)}_filtered_analysis.csv"
         fp, _ = QFileDialog.getSaveFileName(self, "Export Filtered Analysis", default_name, "CSV (*.csv)")
         if fp: self.analysis_service.export_results(filtered_results, unit, fp)
 
@@ -702,7 +840,7 @@ class MainWindow(QMainWindow):
     def _trigger_picklist_animation(self):
         # ... (Logic remains similar, calls self.animation_service.prepare_animation_data) ...
         if not self.model.can_analyze_or_animate: QMessageBox.warning(self, "Animate", "Set PDF, scale, points & precompute."); return
-        fp, _ = QFileDialog.getOpenFileName(self, "Open Picklist for Animation", "", "CSV (*.csv);;Text (*.txt)")
+        fp = self._ask_picklist_path("Open Picklist for Animation")
         if not fp: self.statusBar().showMessage("Animation cancelled."); return
         try:
             dlg = AnimationPicklistDialog(fp, self)
@@ -716,14 +854,13 @@ class MainWindow(QMainWindow):
         self.animation_timer.stop()
         self.pdf_viewer.clear_animation_overlay()
         if self.animation_control_dialog:
-            # Disconnect to prevent issues if dialog is already closing
-            try: self.animation_control_dialog.rejected.disconnect(self._stop_animation_and_close_dialog)
-            except RuntimeError: pass # Signal was not connected or already disconnected
+            # Disconnect by the saved handles first so close() cannot re-enter via rejected (and the model stops hearing the closed dialog)
+            for conn in self._anim_dialog_conns: QObject.disconnect(conn)
+            self._anim_dialog_conns = []
             self.animation_control_dialog.close()
             self.animation_control_dialog = None
         self.current_animation_time_s = 0.0
-        self._animation_data_prepared = []
-        self._animation_earliest_dt_prepared = None
+        self._set_animation_data([], None)
         print("[MainWindow] Animation stopped and dialog closed.")
 
     @Slot(bool)
@@ -731,10 +868,12 @@ class MainWindow(QMainWindow):
         if play and self._animation_data_prepared:
             if self._filtered_max_time_s is not None and self.current_animation_time_s >= self._filtered_max_time_s:
                 self._reset_animation_state_and_frame()
+            self._set_animation_tick_interval(ANIMATION_TICK_MS); self._anim_cost_ewma_ms = 0.0 # Re-adapt from the base rate
             self.animation_timer.start()
             self.statusBar().showMessage("Animation Playing...", 0)
         else:
             self.animation_timer.stop()
+            if self._animation_data_prepared: self._update_animation_frame() # Redraw unculled so panning while paused shows everything
             self.statusBar().showMessage("Animation Paused.", 3000)
 
     @Slot(bool) # Slot decorator, takes a boolean indicating success
@@ -789,6 +928,28 @@ class MainWindow(QMainWindow):
         # Crucially, update UI states as precomputation affects what can be done next
         self._update_all_ui_states()       
 
+    @Slot(int)
+    def _handle_precomputation_started(self, count: int):
+        self._precompute_expected_total = count; self._last_progress_ms = 0.0
+        self.statusBar().showMessage(f"Precomputing paths for {count} points...", 0)
+
+    @Slot(int, str)
+    def _handle_precomputation_progress(self, done: int, name: str):
+        now_ms = time.monotonic() * 1000
+        if now_ms - self._last_progress_ms < PROGRESS_UPDATE_MIN_INTERVAL_MS and done != self._precompute_expected_total: return
+        self._last_progress_ms = now_ms
+        self.statusBar().showMessage(f"Precomputed {done} paths (current: {name})...", 0)
+
+    @Slot(str)
+    def _handle_analysis_started(self, file_path: str):
+        self._current_job_file_name = _file_name(file_path)
+        self.statusBar().showMessage(f"Analyzing: {self._current_job_file_name}...", 0)
+
+    @Slot(str)
+    def _handle_animation_preparation_started(self, file_path: str):
+        self._current_job_file_name = _file_name(file_path)
+        self.statusBar().showMessage(f"Preparing animation: {self._current_job_file_name}...", 0)
+
     @Slot(list, list, str, str) # Slot: detailed_results, warnings_list, unit_str, input_filename_str
     def _handle_analysis_complete(self,
                                   detailed_results: List[Dict[str, Any]],
@@ -796,7 +957,7 @@ class MainWindow(QMainWindow):
                                   unit: str,
                                   input_filename: str):
         
-        file_base_name = QFileInfo(input_filename).fileName()
+        file_base_name = self._current_job_file_name or _file_name(input_filename) # Resolved at analysis start
         self.statusBar().showMessage(f"Analysis of '{file_base_name}' complete.", 5000)
 
         # Cache the results for "View Last Analysis" and "Export Last Analysis"
@@ -817,15 +978,12 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.information(self, "Analysis Info", "Analysis complete. No data processed and no warnings.")
 
-    @Slot(list, object) 
-    def _handle_animation_data_prepared(self, animation_data_from_signal: List[Dict[str, Any]], earliest_dt_from_signal: Optional[datetime]):
+    @Slot(list, datetime) # Matches AnimationService.preparation_complete exactly
+    def _handle_animation_data_prepared(self, animation_data_from_signal: List[AnimationItem], earliest_dt_from_signal: Optional[datetime]):
         print(f"[MainWindow] _handle_animation_data_prepared received {len(animation_data_from_signal)} items.")
-        if animation_data_from_signal:
+        if DEBUG_ANIMATION_VERBOSE and animation_data_from_signal: # Sample items carry full path point lists; only format them when asked to
             print(f"[MainWindow] Sample received animation data item: {animation_data_from_signal[0]}")
-            if 'start_dt' in animation_data_from_signal[0]:
-                print(f"[MainWindow] Sample item start_dt: {animation_data_from_signal[0]['start_dt']} (type: {type(animation_data_from_signal[0]['start_dt'])})")
-            else:
-                print("[MainWindow] WARNING: Received anim_data item MISSING 'start_dt'!")
+            print(f"[MainWindow] Sample item start_dt: {animation_data_from_signal[0].start_dt}")
         print(f"[MainWindow] Received earliest_dt: {earliest_dt_from_signal}")
 
         # 1. Stop any existing animation and close its dialog FIRST
@@ -835,43 +993,26 @@ class MainWindow(QMainWindow):
         if not animation_data_from_signal:
             QMessageBox.warning(self, "Animation Data", "No valid animation data could be prepared.")
             self.statusBar().showMessage("Animation data preparation resulted in no usable entries.", 5000)
-            self._animation_data_prepared = [] # Ensure it's empty if new data is bad
-            self._animation_earliest_dt_prepared = None
+            self._set_animation_data([], None) # Ensure it's empty if new data is bad
             self._update_all_ui_states()
             return
 
         # 3. Now assign the new data to instance variables
-        self._animation_data_prepared = animation_data_from_signal
-        self._animation_earliest_dt_prepared = earliest_dt_from_signal
+        self._set_animation_data(animation_data_from_signal, earliest_dt_from_signal)
         self.statusBar().showMessage("Animation data ready. Opening controls...", 3000)
 
-        # 4. Extract clusters and dates from the newly set self._animation_data_prepared
-        all_starts_set = set()
-        all_ends_set = set()
-        unique_dates_str_set = set()
-
+        # 4. Extract clusters and dates from the per-item arrays built by _set_animation_data (one pass over unique ids, not items)
         print(f"[MainWindow] Processing {len(self._animation_data_prepared)} items for dialog setup...")
-
-        for idx, item in enumerate(self._animation_data_prepared): # Now this will use the new data
-            start_name = item.get('start_name')
-            end_name = item.get('end_name')
-            item_start_dt = item.get('start_dt')
-
-            if start_name:
-                start_cluster = _get_cluster_from_name(start_name)
-                if start_cluster: all_starts_set.add(start_cluster)
-            if end_name:
-                end_cluster = _get_cluster_from_name(end_name)
-                if end_cluster: all_ends_set.add(end_cluster)
-            if item_start_dt and isinstance(item_start_dt, datetime):
-                unique_dates_str_set.add(item_start_dt.strftime("%Y-%m-%d"))
+        all_starts_set = {self._anim_cluster_names[cid] for cid in np.unique(self._anim_start_cluster_id)} - {None}
+        all_ends_set = {self._anim_cluster_names[cid] for cid in np.unique(self._anim_end_cluster_id)} - {None}
+        # np.unique returns the yyyymmdd keys already sorted, and that order is chronological, so no string sort is needed
+        sorted_unique_dates = [_date_key_to_str(d) for d in np.unique(self._anim_date_ord).tolist()]
         
-        sorted_unique_dates = sorted(list(unique_dates_str_set))
-        
-        print(f"[MainWindow] Extracted Start Clusters: {all_starts_set}")
-        print(f"[MainWindow] Extracted End Clusters: {all_ends_set}")
-        print(f"[MainWindow] Extracted Unique Dates (strings): {unique_dates_str_set}")
-        print(f"[MainWindow] Sorted Unique Dates for Dialog: {sorted_unique_dates}")
+        if DEBUG_ANIMATION_VERBOSE:
+            print(f"[MainWindow] Extracted Start Clusters: {all_starts_set}")
+            print(f"[MainWindow] Extracted End Clusters: {all_ends_set}")
+            print(f"[MainWindow] Sorted Unique Dates for Dialog: {sorted_unique_dates}")
+        else: print(f"[MainWindow] Dialog setup: {len(all_starts_set)} start clusters, {len(all_ends_set)} end clusters, {len(sorted_unique_dates)} dates.")
 
         # 5. Create and show the dialog
         self.animation_control_dialog = AnimationControlDialog(
@@ -884,12 +1025,15 @@ class MainWindow(QMainWindow):
             self
         )
         # ... (connections and showing the dialog) ...
-        self.animation_control_dialog.play_pause_toggled.connect(self._toggle_animation_playback)
-        self.animation_control_dialog.reset_clicked.connect(self._reset_animation_state_and_frame)
-        self.animation_control_dialog.speed_changed.connect(self._set_animation_speed)
-        self.animation_control_dialog.filters_changed.connect(self._apply_animation_filters)
-        self.animation_control_dialog.cart_dimensions_changed.connect(self.model.set_animation_cart_dimensions)
-        self.animation_control_dialog.rejected.connect(self._stop_animation_and_close_dialog)
+        dlg = self.animation_control_dialog
+        self._anim_dialog_conns = [
+            dlg.play_pause_toggled.connect(self._toggle_animation_playback),
+            dlg.reset_clicked.connect(self._reset_animation_state_and_frame),
+            dlg.speed_changed.connect(self._set_animation_speed),
+            dlg.filters_changed.connect(self._apply_animation_filters),
+            dlg.cart_dimensions_changed.connect(self.model.set_animation_cart_dimensions),
+            dlg.rejected.connect(self._stop_animation_and_close_dialog),
+        ]
 
         initial_date_filter = "All Dates"
         if sorted_unique_dates:
@@ -928,13 +1072,17 @@ class MainWindow(QMainWindow):
         self.statusBar().showMessage("Animation Reset.", 3000)
 
     @Slot(int)
-    def _set_animation_speed(self, speed: int): self.animation_speed_multiplier = float(speed)
+    def _set_animation_speed(self, speed: int):
+        self.animation_speed_multiplier = float(speed) # _anim_tick_seconds follows the interval, kept by _set_animation_tick_interval
 
     @Slot(str, list, list, AnimationMode, int, bool)
     def _apply_animation_filters(self, date_str, start_clusters, end_clusters, mode, duration_min, keep_paths):
-        self._animation_selected_date_filter = date_str
-        self._animation_active_start_clusters = set(start_clusters)
-        self._animation_active_end_clusters = set(end_clusters)
+        filter_key = (date_str, tuple(start_clusters), tuple(end_clusters))
+        if filter_key != self._last_animation_filter_key: # Mode/duration-only changes keep the cluster sets and the filtered order
+            self._animation_selected_date_filter = date_str
+            self._animation_active_start_clusters = frozenset(start_clusters)
+            self._animation_active_end_clusters = frozenset(end_clusters)
+            self._anim_filtered_order = None; self._last_animation_filter_key = filter_key
         self._animation_mode_current = mode
         self._path_visibility_duration_s_current = duration_min * 60
         self._keep_paths_visible_current = keep_paths
@@ -942,186 +1090,250 @@ class MainWindow(QMainWindow):
         self._reset_animation_state_and_frame()
         self.statusBar().showMessage(f"Animation filters updated. Mode: {mode.value}", 3000)
 
+    def _set_animation_data(self, data: List[AnimationItem], earliest_dt: Optional[datetime]):
+        """Stores prepared animation items and builds the parallel per-item arrays used for filtering."""
+        self._animation_data_prepared = data
+        self._animation_earliest_dt_prepared = earliest_dt
+        n = len(data)
+        self._anim_start_s = np.fromiter((d.start_time_s for d in data), dtype=np.float64, count=n)
+        self._anim_end_s = np.fromiter((d.end_time_s for d in data), dtype=np.float64, count=n)
+        # AnimationService only emits fully validated items (names, datetimes, path points), so index them directly
+        start_dts = [d.start_dt for d in data]
+        self._anim_start_ts = np.fromiter((dt.timestamp() for dt in start_dts), dtype=np.float64, count=n)
+        self._anim_date_ord = np.fromiter((dt.year*10000 + dt.month*100 + dt.day for dt in start_dts), dtype=np.int32, count=n)
+        self._anim_num_points = np.fromiter((len(d.path_points) for d in data), dtype=np.int32, count=n)
+        self._anim_path_offsets = np.zeros(n + 1, dtype=np.int64); np.cumsum(self._anim_num_points, out=self._anim_path_offsets[1:])
+        self._anim_path_xy = np.fromiter((c for d in data for p in d.path_points for c in (p.x(), p.y())), dtype=np.float32,
+                                         count=2 * int(self._anim_path_offsets[-1])).reshape(-1, 2)
+        # Path geometry is static, so segment deltas and headings are computed once here instead of per frame.
+        # The row after each item's last point holds the next item's first point; no frame ever reads that "segment".
+        seg_delta = np.zeros(self._anim_path_xy.shape, dtype=np.float64)
+        seg_delta[:-1] = np.diff(self._anim_path_xy.astype(np.float64), axis=0)
+        self._anim_seg_delta = seg_delta.astype(np.float32)
+        self._anim_seg_angle = np.degrees(np.arctan2(seg_delta[:, 1], seg_delta[:, 0])).astype(np.float32)
+        # Path bounding boxes for viewport culling (items without points keep an empty, never-visible box)
+        self._anim_path_bbox = np.tile(np.array([np.inf, np.inf, -np.inf, -np.inf], dtype=np.float32), (n, 1))
+        has_points = self._anim_num_points > 0
+        if has_points.any():
+            starts = self._anim_path_offsets[:-1][has_points] # Consecutive non-empty runs, so reduceat spans exactly each item's rows
+            self._anim_path_bbox[has_points, :2] = np.minimum.reduceat(self._anim_path_xy, starts, axis=0)
+            self._anim_path_bbox[has_points, 2:] = np.maximum.reduceat(self._anim_path_xy, starts, axis=0)
+        self._anim_by_start = by_start = np.argsort(self._anim_start_s, kind='stable')
+        dates_by_start = self._anim_date_ord[by_start]
+        self._anim_date_buckets = {int(d): by_start[dates_by_start == d] for d in np.unique(dates_by_start)}
+        # Intern start/end clusters to small ints so per-frame cluster filtering is a lookup-table gather
+        start_names = [d.start_name for d in data]; end_names = [d.end_name for d in data]
+        cluster_of = {name: _get_cluster_from_name(name) for name in set(start_names).union(end_names)} # Regex once per distinct name
+        start_clusters = [cluster_of[name] for name in start_names]
+        end_clusters = [cluster_of[name] for name in end_names]
+        self._anim_cluster_names = [None] + sorted({c for c in start_clusters + end_clusters if c})
+        cluster_ids = {c: i for i, c in enumerate(self._anim_cluster_names)}
+        self._anim_start_cluster_id = np.fromiter((cluster_ids[c] for c in start_clusters), dtype=np.int32, count=n)
+        self._anim_end_cluster_id = np.fromiter((cluster_ids[c] for c in end_clusters), dtype=np.int32, count=n)
+        self._anim_filtered_order = None # Rebuilt lazily for the new data
+
+    def _cluster_filter_lut(self, active_clusters: frozenset) -> np.ndarray:
+        """Per cluster id: passes the filter? An empty filter passes everything, a None cluster only then."""
+        return np.array([not active_clusters or (c is not None and c in active_clusters) for c in self._anim_cluster_names], dtype=bool)
+
+    def _filtered_animation_order(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        """(item indices passing the date/cluster filters sorted by start, their start times,
+        running max of their end times in that order, longest duration among them)."""
+        if self._anim_filtered_order is None:
+            mask = self._anim_num_points > 1
+            if self._animation_selected_date_filter != "All Dates": mask &= self._anim_date_ord == _date_str_to_key(self._animation_selected_date_filter)
+            mask &= self._cluster_filter_lut(self._animation_active_start_clusters)[self._anim_start_cluster_id]
+            mask &= self._cluster_filter_lut(self._animation_active_end_clusters)[self._anim_end_cluster_id]
+            order = self._anim_by_start[mask[self._anim_by_start]]
+            max_duration = float((self._anim_end_s[order] - self._anim_start_s[order]).max()) if len(order) else 0.0
+            end_prefix_max = np.maximum.accumulate(self._anim_end_s[order]) if len(order) else np.empty(0, dtype=np.float64)
+            self._anim_filtered_order = (order, self._anim_start_s[order], end_prefix_max, max(max_duration, 0.0))
+        return self._anim_filtered_order
+
+    def _derive_cart_size_px(self) -> Tuple[float, float]:
+        """Cart (width, length) in pixels, cached until the scale, cart dimensions or model change."""
+        scale = self.model.scale_pixels_per_unit
+        scale_px_per_unit = scale if scale is not None and scale > 0 else 1.0
+        self._anim_cart_size_px = (self.model.animation_cart_width * scale_px_per_unit, self.model.animation_cart_length * scale_px_per_unit)
+        return self._anim_cart_size_px
+
+    def _active_animation_indices(self, current_time_s: float) -> np.ndarray:
+        """Indices of prepared items drawn at current_time_s under the current date/cluster/mode settings."""
+        order, starts, end_prefix_max, max_duration = self._filtered_animation_order()
+        started = int(np.searchsorted(starts, current_time_s, side='right')) # Items with start <= t
+        if self._animation_mode_current == AnimationMode.CARTS: linger_s = 0.0
+        elif self._animation_mode_current == AnimationMode.PATH_LINES:
+            if self._keep_paths_visible_current: return np.sort(order[:started])
+            linger_s = self._path_visibility_duration_s_current
+        else: return np.empty(0, dtype=np.intp)
+        # Skip ahead past items that must have expired, using two binary-searched lower bounds (the tighter one wins):
+        # items starting more than the longest (duration + linger) before t, and the prefix whose latest end + linger is before t.
+        # The duration bound stays wide for as long as the data holds a single long item; the end-max bound tightens once it expires.
+        first = max(int(np.searchsorted(starts, current_time_s - max_duration - linger_s - 1e-6, side='left')),
+                    int(np.searchsorted(end_prefix_max, current_time_s - linger_s - 1e-6, side='left')))
+        window = order[first:started]
+        return np.sort(window[current_time_s <= self._anim_end_s[window] + linger_s]) # Ascending index order, as before
+
     def _recalculate_filtered_animation_time_range(self):
         if not self._animation_data_prepared: self._filtered_min_time_s=0.0; self._filtered_max_time_s=0.0; self._filtered_earliest_dt=None; return
-        min_t, max_t, earliest_dt_filt, found = float('inf'), float('-inf'), None, False
-        for item in self._animation_data_prepared:
-            item_date_str = item['start_dt'].strftime("%Y-%m-%d")
-            if self._animation_selected_date_filter == "All Dates" or item_date_str == self._animation_selected_date_filter:
-                found=True; min_t=min(min_t,item['start_time_s']); max_t=max(max_t,item['end_time_s'])
-                if earliest_dt_filt is None or item['start_dt'] < earliest_dt_filt: earliest_dt_filt = item['start_dt']
-        if found: self._filtered_min_time_s=min_t; self._filtered_max_time_s=max_t if max_t>min_t else min_t; self._filtered_earliest_dt=earliest_dt_filt
+        if self._animation_selected_date_filter == "All Dates": idx = self._anim_by_start
+        else: idx = self._anim_date_buckets.get(_date_str_to_key(self._animation_selected_date_filter), np.empty(0, dtype=np.intp))
+        if len(idx):
+            min_t, max_t = float(self._anim_start_s[idx[0]]), float(self._anim_end_s[idx].max()) # idx is sorted by start time
+            idx_ts = self._anim_start_ts[idx]
+            earliest_idx = int(idx[idx_ts == idx_ts.min()].min()) # First occurrence on ties, like the old strict '<' scan
+            self._filtered_min_time_s=min_t; self._filtered_max_time_s=max_t if max_t>min_t else min_t
+            self._filtered_earliest_dt=self._animation_data_prepared[earliest_idx].start_dt
         else: self._filtered_min_time_s=0.0; self._filtered_max_time_s=0.0; self._filtered_earliest_dt=None
         print(f"[MainWindow] Filtered anim range: [{self._filtered_min_time_s}, {self._filtered_max_time_s}] for date '{self._animation_selected_date_filter}'")
 
     @Slot()
     def _handle_animation_tick(self):
         if not self._animation_data_prepared or self._filtered_max_time_s is None: return
-        time_increment = (self.animation_timer.interval()/1000.0) * self.animation_speed_multiplier
-        self.current_animation_time_s += time_increment
-        if self.current_animation_time_s >= self._filtered_max_time_s:
-            self.current_animation_time_s = self._filtered_max_time_s; self.animation_timer.stop()
-            if self.animation_control_dialog: self.animation_control_dialog.play_pause_button.setChecked(False)
+        dlg, max_t = self.animation_control_dialog, self._filtered_max_time_s
+        old_t = self.current_animation_time_s
+        new_t = old_t + self._anim_tick_seconds * self.animation_speed_multiplier
+        finished = new_t >= max_t
+        if finished:
+            new_t = max_t; self.animation_timer.stop()
+            if dlg: dlg.play_pause_button.setChecked(False)
             self.statusBar().showMessage("Animation Finished.", 3000)
+        self.current_animation_time_s = new_t
+        t0 = time.perf_counter()
         self._update_animation_frame()
-        if self.animation_control_dialog:
-            self.animation_control_dialog.update_time_display(self.current_animation_time_s, self._filtered_earliest_dt) # Pass filtered earliest dt
-            self.animation_control_dialog.update_progress(self.current_animation_time_s, self._filtered_min_time_s or 0.0, self._filtered_max_time_s or 0.0)
+        if dlg and (finished or int(new_t) != int(old_t)): # Clock shows whole seconds; refresh the dialog at most once per simulated second
+            dlg.update_time_display(new_t, self._filtered_earliest_dt) # Pass filtered earliest dt
+            dlg.update_progress(new_t, self._filtered_min_time_s or 0.0, max_t)
+        if not finished: self._adapt_animation_tick_interval((time.perf_counter() - t0) * 1000.0)
+
+    def _adapt_animation_tick_interval(self, cost_ms: float):
+        """Stretch the tick interval while frames cost most of a tick (so timeouts don't back up the event loop), relax it back once they're cheap."""
+        ewma = self._anim_cost_ewma_ms = self._anim_cost_ewma_ms + ANIMATION_COST_EWMA_ALPHA * (cost_ms - self._anim_cost_ewma_ms)
+        interval = self.animation_timer.interval()
+        if ewma > interval * 0.8 and interval < ANIMATION_MAX_TICK_MS:
+            self._set_animation_tick_interval(min(ANIMATION_MAX_TICK_MS, int(ewma * 1.5)))
+        elif ewma < interval * 0.4 and interval > ANIMATION_TICK_MS:
+            self._set_animation_tick_interval(max(ANIMATION_TICK_MS, int(ewma * 1.5)))
+
+    def _set_animation_tick_interval(self, interval_ms: int):
+        if interval_ms == self.animation_timer.interval(): return
+        if DEBUG_ANIMATION_VERBOSE: print(f"[MainWindow] Animation tick interval: {self.animation_timer.interval()} -> {interval_ms} ms")
+        self.animation_timer.setInterval(interval_ms); self._anim_tick_seconds = interval_ms / 1000.0
 
     def _update_animation_frame(self):
         if not self._animation_data_prepared:
             return
 
-        active_items_for_frame = []
+        active_items_for_frame: Any = [] # Path-line dicts, or the carts frame dict of arrays (see PdfViewer._draw_animation_carts)
         current_time_s = self.current_animation_time_s
 
-        # Optional: Print current time only once per few ticks to reduce spam
-        if not hasattr(self, '_anim_tick_count'):
-            self._anim_tick_count = 0
-        # Increase interval for status print (e.g., every 500 ticks instead of 200)
-        self._anim_tick_count = (self._anim_tick_count + 1) % 500
-        
-        if self._anim_tick_count == 1: # Print status periodically
-            print(f"[ANIM TICK STATUS] Global Time: {current_time_s:.2f}s. "
-                  f"Filtered Range: [{self._filtered_min_time_s if self._filtered_min_time_s is not None else 'N/A'}, "
-                  f"{self._filtered_max_time_s if self._filtered_max_time_s is not None else 'N/A'}]. "
-                  f"Mode: {self._animation_mode_current.value}. "
-                  f"Date Filter: '{self._animation_selected_date_filter}'")
-            if self.model.scale_pixels_per_unit:
-                 pass # No need to print scale every time unless debugging scale issues
-                 # print(f"    Scale is: {self.model.scale_pixels_per_unit:.2f} px/{self.model.calibration_unit}")
+        # Periodic status print, only when verbose animation logging is on (the f-string formatting is skipped otherwise)
+        if DEBUG_ANIMATION_VERBOSE:
+            self._anim_tick_count = (getattr(self, '_anim_tick_count', 0) + 1) % 500
+            if self._anim_tick_count == 1: # Print status periodically
+                print(f"[ANIM TICK STATUS] Global Time: {current_time_s:.2f}s. "
+                      f"Filtered Range: [{self._filtered_min_time_s if self._filtered_min_time_s is not None else 'N/A'}, "
+                      f"{self._filtered_max_time_s if self._filtered_max_time_s is not None else 'N/A'}]. "
+                      f"Mode: {self._animation_mode_current.value}. "
+                      f"Date Filter: '{self._animation_selected_date_filter}'")
+                if self.model.scale_pixels_per_unit:
+                     pass # No need to print scale every time unless debugging scale issues
+                     # print(f"    Scale is: {self.model.scale_pixels_per_unit:.2f} px/{self.model.calibration_unit}")
+                else:
+                    print(f"    WARNING: Scale is NOT SET (model.scale_pixels_per_unit is None). Carts may not display correctly.")
+
+        # Frame-invariant settings, read once (model properties and attributes are not re-read per branch or item)
+        mode = self._animation_mode_current
+        if mode == AnimationMode.CARTS: cart_width_px, cart_length_px = self._anim_cart_size_px or self._derive_cart_size_px()
+
+        # Date, cluster and time-window filtering for all items at once; the numeric work runs in the array kernels above,
+        # and Qt/dict objects are only built for the (small) active set
+        active_idx = self._active_animation_indices(current_time_s)
+        # While playing, skip items entirely outside the visible scene area (each tick re-culls, so panning catches up within a frame).
+        # Paused/finished frames are drawn in full, since nothing would redraw them after a pan.
+        cull_rect = self.pdf_viewer.visible_scene_rect() if self.animation_timer.isActive() else None
+        if cull_rect is not None and len(active_idx):
+            if mode == AnimationMode.CARTS: # A cart can reach past its path by up to its own size
+                pad = max(cart_length_px, cart_width_px)
+                cull_rect = cull_rect.adjusted(-pad, -pad, pad, pad)
+            bbox = self._anim_path_bbox[active_idx]
+            in_view = (bbox[:, 2] >= cull_rect.left()) & (bbox[:, 0] <= cull_rect.right()) & \
+                      (bbox[:, 3] >= cull_rect.top()) & (bbox[:, 1] <= cull_rect.bottom())
+            active_idx = active_idx[in_view]
+        start_s, end_s = self._anim_start_s[active_idx], self._anim_end_s[active_idx]
+
+        if mode == AnimationMode.CARTS:
+            if cart_width_px > 0.1 and cart_length_px > 0.1 and len(active_idx):
+                pos, angles = _cart_poses(_animation_progress(current_time_s, start_s, end_s), self._anim_num_points[active_idx],
+                                          self._anim_path_offsets[active_idx], self._anim_path_xy, self._anim_seg_delta, self._anim_seg_angle)
+                # Handed over as arrays; the viewer reads them straight into item transforms (no per-cart dict or QPointF)
+                active_items_for_frame = {'xy': pos, 'angle': angles, 'width': cart_width_px, 'length': cart_length_px}
+
+        elif mode == AnimationMode.PATH_LINES:
+            if self._keep_paths_visible_current:
+                draw_progress = np.ones(len(active_idx)); alphas = np.full(len(active_idx), 255)
             else:
-                print(f"    WARNING: Scale is NOT SET (model.scale_pixels_per_unit is None). Carts may not display correctly.")
-
-
-        scale_px_per_unit = self.model.scale_pixels_per_unit if self.model.scale_pixels_per_unit is not None and self.model.scale_pixels_per_unit > 0 else 1.0
-
-        for item_idx, item in enumerate(self._animation_data_prepared):
-            item_start_dt = item.get('start_dt')
-            if not isinstance(item_start_dt, datetime):
-                if self._anim_tick_count == 1 and item_idx < 2 : print(f"[ANIM FRAME WARN] Item {item_idx} has invalid start_dt: {item_start_dt}")
-                continue
-
-            item_date_str = item_start_dt.strftime("%Y-%m-%d")
-            
-            # Date Filter Check
-            date_match = (self._animation_selected_date_filter == "All Dates" or
-                          item_date_str == self._animation_selected_date_filter)
-            if not date_match:
-                continue
-            
-            # Cluster Filter Check
-            start_cluster = _get_cluster_from_name(item.get('start_name'))
-            end_cluster = _get_cluster_from_name(item.get('end_name'))
-            start_cluster_match = (not self._animation_active_start_clusters or
-                                   (start_cluster and start_cluster in self._animation_active_start_clusters))
-            end_cluster_match = (not self._animation_active_end_clusters or
-                                 (end_cluster and end_cluster in self._animation_active_end_clusters))
-            if not (start_cluster_match and end_cluster_match):
-                continue
-
-            item_start_s, item_end_s, path_points = item['start_time_s'], item['end_time_s'], item['path_points']
-            item_id = item.get('id', f'Item_{item_idx}')
-
-            if self._animation_mode_current == AnimationMode.CARTS:
-                if item_start_s <= current_time_s <= item_end_s and len(path_points) > 1:
-                    duration = item_end_s - item_start_s
-                    progress = (current_time_s - item_start_s) / duration if duration > 1e-6 else 1.0
-                    progress = max(0.0, min(1.0, progress))
-                    
-                    idx_float = progress * (len(path_points) -1)
-                    seg_idx = int(idx_float); seg_prog = idx_float - seg_idx
-                    seg_idx = min(seg_idx, len(path_points)-2) 
-                    next_idx = min(seg_idx + 1, len(path_points) - 1)
-                    
-                    p1, p2 = path_points[seg_idx], path_points[next_idx]
-                    pos = QPointF(p1.x()+(p2.x()-p1.x())*seg_prog, p1.y()+(p2.y()-p1.y())*seg_prog)
-                    angle = math.degrees(math.atan2(p2.y()-p1.y(), p2.x()-p1.x()))
-                    
-                    cart_width_px = self.model.animation_cart_width * scale_px_per_unit
-                    cart_length_px = self.model.animation_cart_length * scale_px_per_unit
-
-                   
-                    if cart_width_px > 0.1 and cart_length_px > 0.1 :
-                        active_items_for_frame.append({
-                            'pos': pos, 'angle': angle,
-                            'width': cart_width_px, 'length': cart_length_px
-                        })
-
-            elif self._animation_mode_current == AnimationMode.PATH_LINES:
-                is_visible_this_tick = False; alpha = 255; draw_progress = 0.0
-                if self._keep_paths_visible_current:
-                    if item_start_s <= current_time_s: is_visible_this_tick = True; draw_progress = 1.0
-                else: 
-                    if item_start_s <= current_time_s <= (item_end_s + self._path_visibility_duration_s_current):
-                        is_visible_this_tick = True
-                        duration = item_end_s - item_start_s
-                        draw_progress = (current_time_s-item_start_s)/duration if duration > 1e-6 else 1.0
-                        draw_progress = max(0.0,min(1.0,draw_progress))
-                        if current_time_s > item_end_s and self._path_visibility_duration_s_current > 1e-6:
-                            fade_p = (current_time_s-item_end_s)/self._path_visibility_duration_s_current
-                            alpha=int(255*(1.0-max(0.0,min(1.0,fade_p))))
-                
-                if is_visible_this_tick and alpha > 0 and len(path_points) > 1:
-
-                    active_items_for_frame.append({
-                        'id': item_id, 'points': path_points, 'draw_progress': draw_progress,
-                        'alpha': alpha, 'start_cluster': start_cluster
-                    })
-        
-        
-        self.pdf_viewer.update_animation_overlay(self._animation_mode_current, active_items_for_frame)
+                draw_progress = _animation_progress(current_time_s, start_s, end_s)
+                alphas = _path_line_alphas(current_time_s, end_s, self._path_visibility_duration_s_current)
+            visible = alphas > 0 # Drop fully faded paths before touching any per-item Python objects
+            shown_idx = active_idx[visible]
+            items, cluster_names = self._animation_data_prepared, self._anim_cluster_names # Bound once, not per item
+            active_items_for_frame = [
+                {'id': items[i].id, 'points': items[i].path_points, 'draw_progress': dp, 'alpha': alpha, 'start_cluster': cluster_names[cid]}
+                for i, dp, alpha, cid in zip(shown_idx.tolist(), draw_progress[visible].tolist(), alphas[visible].tolist(),
+                                             self._anim_start_cluster_id[shown_idx].tolist())]
+
+        self.pdf_viewer.update_animation_overlay(mode, active_items_for_frame)
         self.pdf_viewer.viewport().update()
 
     # --- UI State Updaters ---
+    def _schedule_ui_state_update(self): self._ui_state_timer.start() # Repeated starts keep a single pending refresh
+
     def _update_all_ui_states(self):
+        self._ui_state_timer.stop() # A pending deferred refresh is covered by this one
         self._update_comboboxes(); self._update_action_states(); self._update_spinbox_values_from_model()
         self._update_granularity_label(); self._update_window_title(); self._update_unit_menu_state()
 
     def _update_comboboxes(self):
-        start_t, end_t = self.start_combo.currentText(), self.end_combo.currentText()
-
-        # Get keys and sort them using the natural_sort_key
-        pick_aisle_names = sorted(list(self.model.pick_aisles.keys()), key=natural_sort_key)
-        staging_location_names = sorted(list(self.model.staging_locations.keys()), key=natural_sort_key)
-
-        self.start_combo.clear()
-        self.start_combo.addItems(pick_aisle_names)
-
-        self.end_combo.clear()
-        self.end_combo.addItems(staging_location_names)
-
-        # Restore previous selection if still valid
-        if start_t in self.model.pick_aisles:
-            self.start_combo.setCurrentText(start_t)
-        elif not pick_aisle_names: # If list is empty after sorting
-            self.start_combo.setPlaceholderText("No Pick Aisles")
-        elif self.start_combo.count() > 0 : # Default to first item if previous not found
-             self.start_combo.setCurrentIndex(0)
-
-
-        if end_t in self.model.staging_locations:
-            self.end_combo.setCurrentText(end_t)
-        elif not staging_location_names: # If list is empty
-            self.end_combo.setPlaceholderText("No Staging Locations")
-        elif self.end_combo.count() > 0: # Default to first item
-            self.end_combo.setCurrentIndex(0)
+        # Natural sort and combo rebuild only when a key set actually changed (each model getter returns a fresh copy, so read once)
+        pick_aisle_keys, staging_location_keys = frozenset(self.model.pick_aisles), frozenset(self.model.staging_locations)
+        if pick_aisle_keys != self._start_combo_keys:
+            self._refresh_combo(self.start_combo, sorted(pick_aisle_keys, key=natural_sort_key), "No Pick Aisles")
+            self._start_combo_keys = pick_aisle_keys
+        if staging_location_keys != self._end_combo_keys:
+            self._refresh_combo(self.end_combo, sorted(staging_location_keys, key=natural_sort_key), "No Staging Locations")
+            self._end_combo_keys = staging_location_keys
+
+    def _refresh_combo(self, combo: QComboBox, names: List[str], empty_placeholder: str):
+        """Repopulates a combo in one batch with signals blocked, keeping the previous selection if still valid."""
+        if not names: combo.setPlaceholderText(empty_placeholder) # Before the unchanged check: an empty combo may never have had it set
+        if [combo.itemText(i) for i in range(combo.count())] == names: return # Unchanged, keep selection as-is
+        prev_text = combo.currentText()
+        combo.blockSignals(True)
+        combo.clear(); combo.addItems(names)
+        if names: combo.setCurrentIndex(max(0, combo.findText(prev_text))) # Default to first item if previous not found
+        combo.blockSignals(False)
 
     def _update_action_states(self):
-        pdf_ok, scale_ok, pts_ok, grid_ok = self.model.current_pdf_path is not None, self.model.is_scale_set, \
-                                          self.model.has_pick_aisles and self.model.has_staging_locations, self.model.grid_is_valid
-        self.save_project_action.setEnabled(self.model.is_saveable and bool(self.model.current_project_path))
-        self.save_as_project_action.setEnabled(self.model.is_saveable)
+        model = self.model
+        pdf_ok, scale_ok, grid_ok, saveable = model.current_pdf_path is not None, model.is_scale_set, model.grid_is_valid, model.is_saveable
+        can_calc, can_precompute, can_analyze = model.can_calculate_paths, model.can_precompute, model.can_analyze_or_animate
+        has_results = self._last_analysis_detailed_results is not None
+        state = (pdf_ok, scale_ok, grid_ok, saveable, bool(model.current_project_path), can_calc, can_precompute, can_analyze, has_results)
+        if state == self._last_action_state: return # Nothing else toggles these actions, so an unchanged state needs no setEnabled calls
+        self._last_action_state = state
+        self.save_project_action.setEnabled(saveable and bool(model.current_project_path))
+        self.save_as_project_action.setEnabled(saveable)
         self.set_scale_action.setEnabled(pdf_ok); self.edit_mode_action.setEnabled(pdf_ok)
         for act in [self.draw_obstacle_action, self.define_staging_area_action, self.set_start_point_action,
                     self.set_end_point_action, self.define_aisle_line_action, self.define_staging_line_action]: act.setEnabled(scale_ok)
         self.define_bounds_action.setEnabled(scale_ok) # <<< ENABLE/DISABLE BOUNDS ACTION        
-        self.calculate_button.setEnabled(self.model.can_calculate_paths and grid_ok)
-        self.precompute_paths_action.setEnabled(self.model.can_precompute) # Grid can be generated if needed
-        self.analyze_picklist_action.setEnabled(self.model.can_analyze_or_animate)
-        self.animate_picklist_action.setEnabled(self.model.can_analyze_or_animate)
-        self.view_last_analysis_action.setEnabled(self._last_analysis_detailed_results is not None)
-        self.export_last_analysis_action.setEnabled(self._last_analysis_detailed_results is not None)
+        self.calculate_button.setEnabled(can_calc and grid_ok)
+        self.precompute_paths_action.setEnabled(can_precompute) # Grid can be generated if needed
+        self.analyze_picklist_action.setEnabled(can_analyze)
+        self.animate_picklist_action.setEnabled(can_analyze)
+        self.view_last_analysis_action.setEnabled(has_results)
+        self.export_last_analysis_action.setEnabled(has_results)
 
     def _update_spinbox_values_from_model(self):
         self.resolution_spinbox.blockSignals(True); self.penalty_spinbox.blockSignals(True)
@@ -1139,8 +1351,8 @@ class MainWindow(QMainWindow):
 
     def _update_window_title(self):
         base = "Warehouse Path Finder"
-        if self.model.current_project_path: self.setWindowTitle(f"{base} - {QFileInfo(self.model.current_project_path).fileName()}")
-        elif self.model.current_pdf_path: self.setWindowTitle(f"{base} - {QFileInfo(self.model.current_pdf_path).fileName()}*")
+        if self.model.current_project_path: self.setWindowTitle(f"{base} - {_file_name(self.model.current_project_path)}")
+        elif self.model.current_pdf_path: self.setWindowTitle(f"{base} - {_file_name(self.model.current_pdf_path)}*")
         else: self.setWindowTitle(base)
 
     def _update_unit_menu_state(self):
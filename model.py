@@ -1,12 +1,21 @@
 # --- START OF FILE Warehouse-Path-Finder-main/model.py ---
 
+import os
 import numpy as np
-from PySide6.QtCore import QObject, Signal, QFileInfo, QRectF, QPointF
+from PySide6.QtCore import QObject, Signal, QRectF, QPointF
 from PySide6.QtGui import QPolygonF # <<< QPolygonF from QtGui
 # QPolygonF was previously imported from QtGui, now from QtCore.
 # QPointF was previously implicitly used or assumed to be from QtCore.
 
-from typing import Optional, List, Dict, Any # For type hints if used
+from typing import Optional, List, Dict, Any, Tuple # For type hints if used
+
+from enums import PointType
+
+def _points_to_soa(points: Dict[str, QPointF]) -> Tuple[List[str], np.ndarray]:
+    """Splits a {name: QPointF} dict into (names, xy) with xy a (N, 2) float64 array in the same order."""
+    names = list(points.keys())
+    xy = np.array([(p.x(), p.y()) for p in points.values()], dtype=np.float64).reshape(len(names), 2)
+    return names, xy
 
 class WarehouseModel(QObject):
     """
@@ -37,6 +46,7 @@ class WarehouseModel(QObject):
         print("[Model] Clearing data")
         self._current_project_path: str | None = None
         self._current_pdf_path: str | None = None
+        self._pdf_base_name_cache: Tuple[str | None, str | None] = (None, None) # (pdf path, its file name)
         self._pdf_bounds: QRectF | None = None # Store PDF bounds
         self._scale_pixels_per_unit: float | None = None
         self._calibration_unit: str | None = None # Unit used during scale setting
@@ -52,6 +62,7 @@ class WarehouseModel(QObject):
         self._user_pathfinding_bounds: QPolygonF | None = None # Polygons defining pathfinding bounds
         self._pick_aisles: dict[str, QPointF] = {}      # {name: QPointF} Start points
         self._staging_locations: dict[str, QPointF] = {} # {name: QPointF} End points
+        self._pick_aisle_soa: Tuple[List[str], np.ndarray] | None = None # Lazily built (names, xy) mirror of _pick_aisles
 
         # --- Derived Data (Managed internally or by services) ---
         self._pathfinding_grid: np.ndarray | None = None
@@ -75,7 +86,11 @@ class WarehouseModel(QObject):
     def current_pdf_path(self) -> str | None: return self._current_pdf_path
     @property
     def pdf_base_name(self) -> str | None:
-        return QFileInfo(self._current_pdf_path).fileName() if self._current_pdf_path else None
+        # Keyed on the path itself, since the project loader assigns _current_pdf_path directly
+        if self._pdf_base_name_cache[0] != self._current_pdf_path:
+            path = self._current_pdf_path
+            self._pdf_base_name_cache = (path, os.path.basename(path) if path else None)
+        return self._pdf_base_name_cache[1]
     @property
     def pdf_bounds(self) -> QRectF | None: return self._pdf_bounds
     @property
@@ -101,6 +116,10 @@ class WarehouseModel(QObject):
     @property
     def staging_locations(self) -> dict[str, QPointF]: return self._staging_locations.copy()
     @property
+    def pick_aisle_coords(self) -> Tuple[List[str], np.ndarray]: # (names, xy), read-only use
+        if self._pick_aisle_soa is None: self._pick_aisle_soa = _points_to_soa(self._pick_aisles)
+        return self._pick_aisle_soa
+    @property
     def pathfinding_grid(self) -> np.ndarray | None: return self._pathfinding_grid # Allow direct access (or add setter)
     @property
     def grid_origin_pdf(self) -> QPointF | None: # Public getter property
@@ -298,16 +317,33 @@ class WarehouseModel(QObject):
             print(f"[Model] Warning: Pick Aisle '{name}' already exists.")
             return False
         print(f"[Model] Adding pick aisle: {name} at {pos}")
-        self._pick_aisles[name] = pos
+        self._pick_aisles[name] = pos; self._pick_aisle_soa = None
         self._invalidate_grid()
         self.points_changed.emit()
         self.save_state_changed.emit(self.is_saveable)
         return True
 
+    def add_points_bulk(self, point_type: PointType, points: List[Tuple[str, QPointF]]) -> Tuple[int, int]:
+        """
+        Adds many pick aisles or staging locations with a single points_changed emit.
+        Existing names are skipped like in the single-point add. Returns (added_count, duplicates_skipped).
+        """
+        target = self._pick_aisles if point_type == PointType.PICK_AISLE else self._staging_locations
+        added, skipped = 0, 0
+        for name, pos in points:
+            if name in target: skipped += 1; continue
+            target[name] = pos; added += 1
+        print(f"[Model] Bulk-added {added} {point_type.value}(s), skipped {skipped} existing.")
+        if added:
+            if point_type == PointType.PICK_AISLE: self._pick_aisle_soa = None; self._invalidate_grid()
+            self.points_changed.emit()
+            self.save_state_changed.emit(self.is_saveable)
+        return added, skipped
+
     def remove_pick_aisle(self, name: str) -> bool:
         if name in self._pick_aisles:
             print(f"[Model] Removing pick aisle: {name}")
-            del self._pick_aisles[name]
+            del self._pick_aisles[name]; self._pick_aisle_soa = None
             # Remove associated paths if they exist
             if name in self._distance_maps: del self._distance_maps[name]
             if name in self._path_maps: del self._path_maps[name]
@@ -325,7 +361,7 @@ class WarehouseModel(QObject):
          if name in self._pick_aisles:
              if self._pick_aisles[name] != new_pos:
                  print(f"[Model] Updating pick aisle: {name} to {new_pos}")
-                 self._pick_aisles[name] = new_pos
+                 self._pick_aisles[name] = new_pos; self._pick_aisle_soa = None
                  self._invalidate_grid()
                  self.points_changed.emit()
                  self.save_state_changed.emit(self.is_saveable)
@@ -392,6 +428,7 @@ class WarehouseModel(QObject):
 
     def mark_project_loaded(self):
         """Signals that project loading is complete."""
+        self._pick_aisle_soa = None # Pick aisles were replaced by the loader
         self._invalidate_grid() # Grid needs recomputing after loading layout changes
         self.project_loaded.emit()
         self.save_state_changed.emit(self.is_saveable) # Update save state
@@ -2,12 +2,14 @@
 # (Minor changes: Ensure COST_OBSTACLE is consistently np.inf, add comments)
 
 import math
+import hashlib
 import numpy as np
 from PySide6.QtCore import Qt, QPointF, QLineF
 from PySide6.QtGui import QPolygonF, QImage, QPainter, QColor, QTransform # <<< QPolygonF from QtGui
-# collections.deque is not used in the last version, heapq is.
-import heapq
-from scipy.ndimage import binary_dilation, generate_binary_structure
+# Shortest-path search uses SciPy's compiled Dijkstra (scipy.sparse.csgraph) rather than a heapq loop.
+from scipy.ndimage import maximum_filter
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
 
 # Tolerance for floating point comparisons
 EPSILON = 1e-6
@@ -82,6 +84,20 @@ OBSTACLE_DILATION_ITERATIONS = 2 # How many pixels to "thicken" obstacles (defau
 DEFAULT_RESOLUTION_FACTOR = 1.0
 DEFAULT_STAGING_PENALTY = 10.0
 
+def _rasterize_polygons_mask(polygons: list[QPolygonF], transform: QTransform, width: int, height: int) -> np.ndarray:
+    """Fills the polygons (mapped through transform) into a Grayscale8 image and returns the (height, width) bool mask of painted pixels."""
+    image = QImage(width, height, QImage.Format.Format_Grayscale8)
+    image.fill(0)
+    painter = QPainter(image)
+    painter.setPen(QColor(255, 255, 255))
+    painter.setBrush(QColor(255, 255, 255))
+    for polygon in polygons:
+        painter.drawPolygon(transform.map(polygon))
+    painter.end()
+    # One byte per pixel; rows are padded to bytesPerLine, so view the raw buffer and crop instead of sampling pixel by pixel
+    pixels = np.frombuffer(image.constBits(), dtype=np.uint8).reshape(height, image.bytesPerLine())[:, :width]
+    return pixels > 128 # Comparison copies out of the image buffer before the image is released
+
 def create_grid_from_obstacles(width: int, height: int, obstacles_pdf_list: list[QPolygonF],
                                resolution_factor: float, # Removed default
                                grid_origin_pdf: QPointF,                              
@@ -100,7 +116,9 @@ def create_grid_from_obstacles(width: int, height: int, obstacles_pdf_list: list
     print(f"[Pathfinding create_grid] Creating cost grid ({width}x{height}) using Grayscale8 rasterization...")
 
     try:
-        grid = np.full((height, width), COST_EMPTY, dtype=np.float32)
+        # Cells are labelled 0 (free), 1 (staging) or 2 (obstacle) in one uint8 array and turned into float32 costs once at the end
+        labels = np.zeros((height, width), dtype=np.uint8)
+        staging_cost = COST_EMPTY + staging_penalty
         scale_factor = 1.0 / resolution_factor
         
         # --- EXPLICIT TRANSFORM CONSTRUCTION ---
@@ -145,7 +163,7 @@ def create_grid_from_obstacles(width: int, height: int, obstacles_pdf_list: list
 
 
         paint_color = QColor(255, 255, 255) 
-        background_color_val = 0
+        background_color_val = 0 # (Used by the commented debug block below; rasterization is in _rasterize_polygons_mask)
 
         # # --- DEBUG: Test rasterization of the FIRST obstacle ONLY ---
         # if obstacles_pdf_list: # Use the new parameter name
@@ -183,59 +201,32 @@ def create_grid_from_obstacles(width: int, height: int, obstacles_pdf_list: list
         # 2. Rasterize Staging Areas
         if staging_areas_pdf_list:
             print(f"[Pathfinding create_grid] Rasterizing staging areas (Grayscale)...")
-            staging_cost = COST_EMPTY + staging_penalty
-            staging_mask = np.zeros((height, width), dtype=bool)
-            staging_image = QImage(width, height, QImage.Format.Format_Grayscale8)
-            staging_image.fill(background_color_val)
-            painter = QPainter(staging_image)
-            painter.setPen(paint_color)
-            painter.setBrush(paint_color)
-            for polygon in staging_areas_pdf_list:
-                scaled_polygon = pdf_to_grid_image_transform.map(polygon)
-                painter.drawPolygon(scaled_polygon)
-            painter.end()
-            for r_idx in range(height):
-                for c_idx in range(width):
-                    if staging_image.pixelColor(c_idx, r_idx).value() > 128:
-                        staging_mask[r_idx, c_idx] = True
-            grid[staging_mask] = staging_cost
+            staging_mask = _rasterize_polygons_mask(staging_areas_pdf_list, pdf_to_grid_image_transform, width, height)
+            labels = staging_mask.astype(np.uint8) # Staging cells -> label 1; obstacle label 2 is written over it below
             print(f"[Pathfinding create_grid] Staging areas rasterized. Mask sum: {np.sum(staging_mask)}")
 
 
         # 3. Rasterize Obstacles
         print("[Pathfinding create_grid] Rasterizing obstacles (Grayscale)...")
-        obstacle_mask = np.zeros((height, width), dtype=bool)
-        obstacle_image = QImage(width, height, QImage.Format.Format_Grayscale8)
-        obstacle_image.fill(background_color_val)
-        painter = QPainter(obstacle_image)
-        painter.setPen(paint_color)
-        painter.setBrush(paint_color)
-        if obstacles_pdf_list:
-            for polygon in obstacles_pdf_list:
-                scaled_polygon = pdf_to_grid_image_transform.map(polygon)
-                painter.drawPolygon(scaled_polygon)
-        painter.end()
-        for r_idx in range(height):
-            for c_idx in range(width):
-                if obstacle_image.pixelColor(c_idx, r_idx).value() > 128:
-                    obstacle_mask[r_idx, c_idx] = True
+        obstacle_mask = _rasterize_polygons_mask(obstacles_pdf_list or [], pdf_to_grid_image_transform, width, height)
         print(f"[Pathfinding create_grid] Obstacles rasterized. Mask sum: {np.sum(obstacle_mask)}")
 
 
         # 4. Dilate obstacles
         if OBSTACLE_DILATION_ITERATIONS > 0 and np.any(obstacle_mask):
             print(f"[Pathfinding create_grid] Dilating obstacles by {OBSTACLE_DILATION_ITERATIONS} iterations...")
-            structure = generate_binary_structure(2, 2)
-            dilated_mask = binary_dilation(obstacle_mask, structure=structure, iterations=OBSTACLE_DILATION_ITERATIONS)
+            # N iterations of the full 3x3 (8-connected) structure equal one square (2N+1) dilation, which maximum_filter
+            # runs as separable 1-D passes; zero padding matches binary_dilation's default border
+            dilated_mask = maximum_filter(obstacle_mask, size=2 * OBSTACLE_DILATION_ITERATIONS + 1, mode='constant')
             print(f"[Pathfinding create_grid] Dilation complete. Dilated mask sum: {np.sum(dilated_mask)}")
-            grid[dilated_mask] = COST_OBSTACLE
+            np.copyto(labels, 2, where=dilated_mask) # Sequential masked store rather than boolean-index scatter
         elif np.any(obstacle_mask):
-            grid[obstacle_mask] = COST_OBSTACLE
+            np.copyto(labels, 2, where=obstacle_mask)
             print("[Pathfinding create_grid] Obstacle dilation skipped, applied original obstacles.")
         else:
             print("[Pathfinding create_grid] No obstacles to dilate or apply.")
 
-        return grid
+        return np.array([COST_EMPTY, staging_cost, COST_OBSTACLE], dtype=np.float32)[labels] # Label -> cost lookup, one pass
 
     except Exception as e:
         print(f"[Pathfinding create_grid] Error during grid creation: {e}")
@@ -244,57 +235,52 @@ def create_grid_from_obstacles(width: int, height: int, obstacles_pdf_list: list
         return None
 
 # --- Other pathfinding functions ---
+# Last grid graph built in this process, keyed by the grid's shape and content digest (precompute runs many starts on one grid)
+_grid_graph_cache: tuple[tuple, csr_matrix] | None = None
+
+def _grid_graph(grid: np.ndarray) -> csr_matrix:
+    """4-connected graph over the flattened grid (cell r*cols+c); stepping into a cell costs that cell's grid value, obstacles have no edges."""
+    global _grid_graph_cache
+    key = (grid.shape, grid.dtype.str, hashlib.sha1(np.ascontiguousarray(grid).data).digest())
+    if _grid_graph_cache is not None and _grid_graph_cache[0] == key: return _grid_graph_cache[1]
+    rows, cols = grid.shape
+    cell = np.arange(rows * cols).reshape(rows, cols)
+    passable = grid != COST_OBSTACLE
+    src, dst = [], []
+    for a, b in ((np.s_[1:, :], np.s_[:-1, :]), (np.s_[:, 1:], np.s_[:, :-1])): # Vertical then horizontal neighbour pairs, both directions
+        both = passable[a] & passable[b]
+        src += [cell[a][both], cell[b][both]]; dst += [cell[b][both], cell[a][both]]
+    src, dst = np.concatenate(src), np.concatenate(dst)
+    graph = csr_matrix((grid.ravel()[dst].astype(np.float64), (src, dst)), shape=(rows * cols, rows * cols))
+    _grid_graph_cache = (key, graph)
+    return graph
+
 def dijkstra_precompute(grid: np.ndarray, start_cell: tuple[int, int]) -> tuple[np.ndarray, np.ndarray | None]:
-    # ... (implementation as before) ...
+    """Distances from start_cell to every cell and each cell's predecessor on a shortest path, as a flat index
+    (row * cols + col, -1 where none). The search runs in SciPy's compiled Dijkstra over _grid_graph instead of a Python heap loop."""
     rows, cols = grid.shape
     if not (0 <= start_cell[0] < rows and 0 <= start_cell[1] < cols) or grid[start_cell] == COST_OBSTACLE:
         invalid_dist = np.full((rows, cols), np.inf, dtype=np.float32)
-        invalid_pred = np.full((rows, cols, 2), -1, dtype=np.int32)
+        invalid_pred = np.full((rows, cols), -1, dtype=np.int32)
         return invalid_dist, invalid_pred
-    distance_grid = np.full((rows, cols), np.inf, dtype=np.float32)
-    predecessor_grid = np.full((rows, cols, 2), -1, dtype=np.int32)
-    distance_grid[start_cell] = 0
-    pq = [(0.0, start_cell)]
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    while pq:
-        d, current_cell = heapq.heappop(pq)
-        cr, cc = current_cell
-        if d > distance_grid[cr, cc] + EPSILON:
-            continue
-        for dr, dc in directions:
-            nr, nc = cr + dr, cc + dc
-            if 0 <= nr < rows and 0 <= nc < cols:
-                move_cost = grid[nr, nc]
-                if move_cost != COST_OBSTACLE:
-                    new_distance = distance_grid[cr, cc] + move_cost
-                    if new_distance < distance_grid[nr, nc] - EPSILON:
-                        distance_grid[nr, nc] = new_distance
-                        predecessor_grid[nr, nc, 0] = cr
-                        predecessor_grid[nr, nc, 1] = cc
-                        heapq.heappush(pq, (new_distance, (nr, nc)))
+    dist, pred = dijkstra(_grid_graph(grid), indices=start_cell[0] * cols + start_cell[1], return_predecessors=True)
+    distance_grid = dist.astype(np.float32).reshape(rows, cols)
+    predecessor_grid = np.where(pred < 0, -1, pred).astype(np.int32).reshape(rows, cols) # Start cell and unreachable cells -> -1
     return distance_grid, predecessor_grid
 
 def reconstruct_path(predecessor_grid: np.ndarray, start_cell: tuple[int, int], end_cell: tuple[int, int]) -> list[tuple[int, int]] | None:
-    # ... (implementation as before) ...
-    path = []
-    current_r, current_c = end_cell
-    if predecessor_grid[current_r, current_c, 0] == -1 and (current_r, current_c) != start_cell:
-        return None 
-    max_steps = predecessor_grid.shape[0] * predecessor_grid.shape[1]
-    steps = 0
-    while (current_r, current_c) != start_cell and steps < max_steps:
-        path.append((current_r, current_c))
-        pred_r, pred_c = predecessor_grid[current_r, current_c]
-        if pred_r == -1:
-             return None
-        current_r, current_c = pred_r, pred_c
-        steps += 1
-    if steps >= max_steps:
-        return None
-    if (current_r, current_c) == start_cell:
-        path.append(start_cell)
-        return path[::-1]
-    else:
-        return None
+    """Cells from start_cell to end_cell following the flat-index predecessor grid, or None if end_cell is unreachable."""
+    cols = predecessor_grid.shape[1]
+    flat_pred = predecessor_grid.ravel()
+    start, current = start_cell[0] * cols + start_cell[1], end_cell[0] * cols + end_cell[1]
+    flat_path = [current] # Walked as flat ints; (row, col) tuples are only built for the finished path
+    for _ in range(predecessor_grid.size): # Bounded: grids can come from a sidecar on disk, and a corrupt one must not loop forever
+        if current == start:
+            return [divmod(i, cols) for i in reversed(flat_path)]
+        current = int(flat_pred[current])
+        if current == -1:
+            return None
+        flat_path.append(current)
+    return None
 
 # --- END OF FILE Warehouse-Path-Finder-main/pathfinding.py ---
\ No newline at end of file
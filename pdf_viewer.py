@@ -2,6 +2,9 @@
 
 import fitz  # PyMuPDF
 import math
+import itertools
+import os
+from collections import OrderedDict
 from PySide6.QtWidgets import (
     QGraphicsView, QGraphicsScene, QGraphicsLineItem,
     QGraphicsPolygonItem, QGraphicsItem, QGraphicsEllipseItem, QGraphicsSimpleTextItem,
@@ -14,7 +17,7 @@ from PySide6.QtGui import (
 )
 from PySide6.QtCore import (
     Qt, Signal, QRectF, QSize, QEvent,
-    QPointF, QLineF
+    QPointF, QLineF, QObject, QRunnable, QThreadPool, QTimer
 )
 
 # Assuming enums.py is in the same directory or accessible in PYTHONPATH
@@ -31,15 +34,45 @@ LABEL_OFFSET_X = 8
 LABEL_OFFSET_Y = -POINT_MARKER_RADIUS
 STAGING_AREA_ALPHA = int(255 * 0.25) # 25% opacity
 ANIMATION_OVERLAY_Z_VALUE = 100
+ANIMATION_CULL_MARGIN_PX = 8 # Screen pixels added around the viewport when culling animation items (covers the cosmetic path pen)
 POINTS_Z_VALUE = 20
 PATH_Z_VALUE = 15
 OBSTACLES_Z_VALUE = 10
 STAGING_AREAS_Z_VALUE = 9
 PDF_Z_VALUE = 0
 BOUNDS_Z_VALUE = 8 # Below staging areas but above PDF
+PREVIEW_UPDATE_INTERVAL_MS = 16 # Drawing previews follow the cursor at most ~60 times a second, however fast mouse events arrive
+PDF_RENDER_ZOOM = 2.0
+PDF_PAGE_CACHE_MAX_ENTRIES = 4 # Rendered pages kept so re-displaying a PDF (e.g. reopening a project on it) skips rasterization
 
 # Set this to True if you need detailed per-frame logs again temporarily
 DEBUG_ANIMATION_VERBOSE = False
+# Page display, mode changes and line drawing run on every click; their trace logs stay off unless this is set
+DEBUG_VIEWER_VERBOSE = False
+
+class _PageRenderSignals(QObject):
+    page_rendered = Signal(int, object, object) # generation, cache key, QImage (None on failure)
+
+
+class _PageRenderTask(QRunnable):
+    """Rasterizes one PDF page on a QThreadPool thread; the image is delivered queued to the GUI thread (QPixmap is GUI-thread only)."""
+    def __init__(self, pdf_path: str, page_number: int, zoom: float, generation: int, cache_key: Optional[tuple]):
+        super().__init__()
+        self.pdf_path, self.page_number, self.zoom, self.generation, self.cache_key = pdf_path, page_number, zoom, generation, cache_key
+        self.signals = _PageRenderSignals() # Created on the GUI thread, so connected slots run there
+
+    def run(self):
+        image = None
+        try:
+            with fitz.open(self.pdf_path) as doc: # Own handle: a fitz.Document must not be used from two threads
+                pix = doc.load_page(self.page_number).get_pixmap(matrix=fitz.Matrix(self.zoom, self.zoom), alpha=False)
+                # Repack to Qt's native 32-bit format here, off the GUI thread: QPixmap.fromImage then adopts it without converting.
+                # The conversion also detaches the image from pix.samples, which is freed with the document.
+                image = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888).convertToFormat(QImage.Format.Format_RGB32)
+        except Exception as e:
+            print(f"[PdfViewer] Error rendering page {self.page_number} of {self.pdf_path}: {e}")
+        self.signals.page_rendered.emit(self.generation, self.cache_key, image)
+
 
 class PdfViewer(QGraphicsView):
     # --- Signals for User Interactions and State Changes ---
@@ -60,6 +93,8 @@ class PdfViewer(QGraphicsView):
         self.current_page_index = 0
         self.current_pdf_path: Optional[str] = None
         self.pixmap_item: Optional[QGraphicsItem] = None
+        self._page_pixmap_cache: "OrderedDict[tuple, QPixmap]" = OrderedDict() # (path, mtime_ns, size, page, zoom) -> rendered page, LRU order
+        self._page_render_generation = 0 # Bumped per displayed/cleared page; renders finishing for an older one are dropped
 
         self.current_mode = InteractionMode.IDLE
         self._is_panning = False
@@ -68,16 +103,28 @@ class PdfViewer(QGraphicsView):
         self._item_being_moved_in_edit_start_pos: QPointF = QPointF()
 
         self._temp_drawing_points: List[QPointF] = []
+        self._temp_preview_polygon = QPolygonF() # Placed polygon points plus a trailing cursor slot, updated in place on mouse move
+        self._temp_snap_x = 0.0; self._temp_snap_y = 0.0 # First polygon point, cached for the close-snap test
+        self._pending_preview_pos: Optional[QPointF] = None
+        self._preview_update_timer = QTimer(self); self._preview_update_timer.setSingleShot(True); self._preview_update_timer.setInterval(PREVIEW_UPDATE_INTERVAL_MS)
+        self._preview_update_timer.timeout.connect(self._flush_preview_update)
         self._temp_line_item: Optional[QGraphicsLineItem] = None
         self._temp_polygon_item: Optional[QGraphicsPolygonItem] = None
 
         self._pathfinding_bounds_item: Optional[QGraphicsPolygonItem] = None # Item to display bounds
         self._obstacle_items: List[QGraphicsPolygonItem] = []
         self._staging_area_items: List[QGraphicsPolygonItem] = []
+        self._polygon_uid_gen = itertools.count(1) # Stable per-item key stored in data(0) of polygon items
         self._start_point_items: Dict[str, Tuple[QGraphicsEllipseItem, QGraphicsSimpleTextItem]] = {}
         self._end_point_items: Dict[str, Tuple[QGraphicsEllipseItem, QGraphicsSimpleTextItem]] = {}
         self._path_item: Optional[QGraphicsPathItem] = None
         self.animation_overlay_group: Optional[QGraphicsItemGroup] = None
+        # Reusable animation overlay items, repositioned every frame instead of being recreated
+        self._animation_cart_pool: List[QGraphicsRectItem] = []
+        self._animation_path_pool: List[QGraphicsPathItem] = []
+        self._animation_cart_rect = QRectF() # Cart shape currently set on every pooled cart item
+        # Fully drawn animation paths never change; keyed by id() of the item's point list (kept alive in the value)
+        self._animation_full_path_cache: Dict[int, Tuple[list, QPainterPath]] = {}
 
         self._setup_styles()
         self.rubber_band = QRubberBand(QRubberBand.Shape.Rectangle, self)
@@ -113,12 +160,19 @@ class PdfViewer(QGraphicsView):
         self._path_pen = QPen(QColor(0, 100, 255), 2, Qt.PenStyle.SolidLine); self._path_pen.setCosmetic(True)
         self._label_font = QFont("Arial", 8)
 
+        # Animation overlay styles (built once, shared by every frame)
+        self._animation_cart_brush = QBrush(QColor(255, 100, 0, 180))
+        self._animation_cluster_colors = [QColor("blue"), QColor("red"), QColor("darkGreen"), QColor("purple"), QColor("orange"), QColor("teal"), QColor("maroon"), QColor("navy"), QColor("olive"), QColor("deeppink")]
+        self._cluster_color_map: Dict[str, QColor] = {}
+        self._animation_path_pens: Dict[Tuple[str, int], QPen] = {} # (cluster, alpha) -> cosmetic pen
+
     def _clear_scene_items(self, clear_pdf=True):
         # ... (rest of the method unchanged) ...
-        print("[PdfViewer] Clearing scene items...")
+        if DEBUG_VIEWER_VERBOSE: print("[PdfViewer] Clearing scene items...")
         if clear_pdf and self.pixmap_item and self.pixmap_item.scene():
             self.scene().removeItem(self.pixmap_item)
             self.pixmap_item = None
+        if clear_pdf: self._page_render_generation += 1 # A render still in flight must not land on the cleared scene
         self.clear_obstacles()
         self.clear_staging_areas()
         self.clear_all_points()
@@ -132,6 +186,7 @@ class PdfViewer(QGraphicsView):
         self.set_mode(InteractionMode.IDLE)
         self._is_panning = False
         self._clear_scene_items(clear_pdf=True)
+        if file_path != self.current_pdf_path: self._page_pixmap_cache.clear() # Keep renders only while the same file is re-displayed
         try:
             self.pdf_document = fitz.open(file_path)
             if self.pdf_document.page_count > 0:
@@ -150,76 +205,77 @@ class PdfViewer(QGraphicsView):
             print("[PdfViewer _display_page] Invalid document or page number.")
             return None
 
-        print(f"[PdfViewer _display_page] Displaying page: {page_number}")
+        if DEBUG_VIEWER_VERBOSE: print(f"[PdfViewer _display_page] Displaying page: {page_number}")
 
         # Clear existing PDF pixmap if any
         if self.pixmap_item and self.pixmap_item.scene():
-            print("[PdfViewer _display_page] Removing old pixmap_item.")
+            if DEBUG_VIEWER_VERBOSE: print("[PdfViewer _display_page] Removing old pixmap_item.")
             self.scene().removeItem(self.pixmap_item)
             self.pixmap_item = None
 
-        page = self.pdf_document.load_page(page_number)
-        zoom_matrix = fitz.Matrix(2.0, 2.0)
-        pix = page.get_pixmap(matrix=zoom_matrix, alpha=False)
-        img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888)
-        self.pixmap_item = self.scene().addPixmap(QPixmap.fromImage(img))
+        # Page size comes from the page rect (same rounding as get_pixmap); the pixels are rendered off the GUI thread unless cached
+        page_irect = (self.pdf_document.load_page(page_number).rect * fitz.Matrix(PDF_RENDER_ZOOM, PDF_RENDER_ZOOM)).irect
+        pdf_rect = QRectF(0, 0, page_irect.width, page_irect.height)
+        self._page_render_generation += 1
+        cache_key = self._page_cache_key(page_number)
+        pixmap = self._page_pixmap_cache.get(cache_key) if cache_key is not None else None
+        if pixmap is not None: self._page_pixmap_cache.move_to_end(cache_key)
+        else:
+            task = _PageRenderTask(self.current_pdf_path, page_number, PDF_RENDER_ZOOM, self._page_render_generation, cache_key)
+            task.signals.page_rendered.connect(self._on_page_rendered)
+            QThreadPool.globalInstance().start(task)
+        self.pixmap_item = self.scene().addPixmap(pixmap if pixmap is not None else QPixmap())
         self.pixmap_item.setZValue(PDF_Z_VALUE)
-        print(f"[PdfViewer _display_page] Added new pixmap_item with ZValue: {self.pixmap_item.zValue()}")
+        if DEBUG_VIEWER_VERBOSE: print(f"[PdfViewer _display_page] Added new pixmap_item with ZValue: {self.pixmap_item.zValue()}")
 
         # Recreate animation overlay group on top
         if self.animation_overlay_group and self.animation_overlay_group.scene():
-            print("[PdfViewer _display_page] Removing old animation_overlay_group from scene.")
+            if DEBUG_VIEWER_VERBOSE: print("[PdfViewer _display_page] Removing old animation_overlay_group from scene.")
             # It's important to remove children if the group itself is not being deleted
             # but since we create a new one, removing the group is fine.
             self.scene().removeItem(self.animation_overlay_group)
+        self._reset_animation_pools() # Pooled items belonged to the old group
         
-        print("[PdfViewer _display_page] Creating new animation_overlay_group.")
+        if DEBUG_VIEWER_VERBOSE: print("[PdfViewer _display_page] Creating new animation_overlay_group.")
         self.animation_overlay_group = QGraphicsItemGroup()
         self.animation_overlay_group.setZValue(ANIMATION_OVERLAY_Z_VALUE)
         # QGraphicsItemGroup is visible by default, no need for setVisible(True) explicitly on creation
         self.scene().addItem(self.animation_overlay_group)
         
-        print(f"[PdfViewer _display_page] New animation_overlay_group added. ZValue: {self.animation_overlay_group.zValue()}, Visible: {self.animation_overlay_group.isVisible()}")
-        print(f"[PdfViewer _display_page] Animation group pos: {self.animation_overlay_group.pos()}, sceneTransform: {self.animation_overlay_group.sceneTransform()}")
+        if DEBUG_VIEWER_VERBOSE: print(f"[PdfViewer _display_page] New animation_overlay_group added. ZValue: {self.animation_overlay_group.zValue()}, Visible: {self.animation_overlay_group.isVisible()}")
+        if DEBUG_VIEWER_VERBOSE: print(f"[PdfViewer _display_page] Animation group pos: {self.animation_overlay_group.pos()}, sceneTransform: {self.animation_overlay_group.sceneTransform()}")
         # Ensure it has no unintended transformations from a previous state (shouldn't happen with new group)
         self.animation_overlay_group.setPos(0,0)
         self.animation_overlay_group.setTransform(QTransform())
 
 
-        # Re-add other persistent items (obstacles, points, path) if they exist
-        print("[PdfViewer _display_page] Re-adding persistent items to scene...")
-        for item in self._obstacle_items:
-            if item.scene() != self.scene(): # Add only if not already in this scene (e.g. if scene was cleared)
-                self.scene().addItem(item)
-                print(f"  Re-added obstacle: {item} Z: {item.zValue()}")
-        for item in self._staging_area_items:
-            if item.scene() != self.scene():
-                self.scene().addItem(item)
-                print(f"  Re-added staging area: {item} Z: {item.zValue()}")
-
-        for name, (marker, label) in self._start_point_items.items():
-            if marker.scene() != self.scene():
-                self.scene().addItem(marker) # Label is child
-                print(f"  Re-added start point marker: {name} Z: {marker.zValue()}")
-        for name, (marker, label) in self._end_point_items.items():
-            if marker.scene() != self.scene():
-                self.scene().addItem(marker)
-                print(f"  Re-added end point marker: {name} Z: {marker.zValue()}")
-
-        if self._path_item and self._path_item.scene() != self.scene():
-            self.scene().addItem(self._path_item)
-            print(f"  Re-added path item: {self._path_item} Z: {self._path_item.zValue()}")
-
-        pdf_rect = self.pixmap_item.boundingRect()
+        # Obstacles, staging areas, points and the path stay in the scene across page changes (the scene itself is never replaced,
+        # and every clear_/remove_ helper drops an item from its list when it leaves the scene), so only the pixmap and overlay are rebuilt
+
         self.setSceneRect(pdf_rect)
-        self.fitInView(self.pixmap_item, Qt.AspectRatioMode.KeepAspectRatio)
-        print("[PdfViewer _display_page] Page display complete.")
+        self.fitInView(pdf_rect, Qt.AspectRatioMode.KeepAspectRatio)
+        if DEBUG_VIEWER_VERBOSE: print("[PdfViewer _display_page] Page display complete.")
         return pdf_rect
 
+    def _page_cache_key(self, page_number: int) -> Optional[tuple]:
+        """Key for the rendered-page cache; includes the file's mtime/size so a changed file is rendered again (None if it can't be stat'ed)."""
+        try: st = os.stat(self.current_pdf_path)
+        except (OSError, TypeError): return None
+        return (self.current_pdf_path, st.st_mtime_ns, st.st_size, page_number, PDF_RENDER_ZOOM)
+
+    def _on_page_rendered(self, generation: int, cache_key: Optional[tuple], image: Optional[QImage]):
+        if generation != self._page_render_generation or self.pixmap_item is None: return # Superseded by a newer page/clear
+        if image is None: self.status_update.emit("Could not render the PDF page.", 5000); return
+        pixmap = QPixmap.fromImage(image)
+        if cache_key is not None:
+            self._page_pixmap_cache[cache_key] = pixmap
+            while len(self._page_pixmap_cache) > PDF_PAGE_CACHE_MAX_ENTRIES: self._page_pixmap_cache.popitem(last=False)
+        self.pixmap_item.setPixmap(pixmap)
+
     def set_mode(self, mode: InteractionMode):
         if self.current_mode == mode: return
 
-        print(f"[PdfViewer] Mode: {self.current_mode.name} -> {mode.name}")
+        if DEBUG_VIEWER_VERBOSE: print(f"[PdfViewer] Mode: {self.current_mode.name} -> {mode.name}")
 
         # If exiting edit mode, disable movability on items
         if self.current_mode == InteractionMode.EDIT and mode != InteractionMode.EDIT:
@@ -276,21 +332,17 @@ class PdfViewer(QGraphicsView):
         else:
             current_flags = base_flags # Only selectable, not movable
 
-        all_managed_polygons = self._obstacle_items + self._staging_area_items
-        for item in all_managed_polygons:
-            if item: # Ensure item is not None
-                item.setFlags(current_flags)
-
-        all_point_markers = [marker for marker, label in self._start_point_items.values() if marker] + \
-                            [marker for marker, label in self._end_point_items.values() if marker]
-        for marker in all_point_markers:
-            if marker: # Ensure marker is not None
-                marker.setFlags(current_flags)
+        # One pass over the existing registries (no concatenated lists); items already carrying the flags are skipped so Qt isn't
+        # asked to re-evaluate them
+        point_markers = (marker for marker, _ in itertools.chain(self._start_point_items.values(), self._end_point_items.values()))
+        for item in itertools.chain(self._obstacle_items, self._staging_area_items, point_markers):
+            if item and item.flags() != current_flags: item.setFlags(current_flags)
 
 
     def _reset_temp_drawing_items(self):
         # ... (rest of the method unchanged) ...
-        self._temp_drawing_points.clear()
+        self._temp_drawing_points.clear(); self._temp_preview_polygon.clear()
+        self._preview_update_timer.stop(); self._pending_preview_pos = None
         if self._temp_line_item and self._temp_line_item.scene(): self.scene().removeItem(self._temp_line_item)
         self._temp_line_item = None
         if self._temp_polygon_item and self._temp_polygon_item.scene(): self.scene().removeItem(self._temp_polygon_item)
@@ -342,24 +394,24 @@ class PdfViewer(QGraphicsView):
 
 
     def _start_line_draw(self, scene_pos: QPointF, next_mode: InteractionMode, pen: QPen):
-        print(f"[PdfViewer] _start_line_draw: pos={scene_pos}, next_mode={next_mode.name}") # Debug
+        if DEBUG_VIEWER_VERBOSE: print(f"[PdfViewer] _start_line_draw: pos={scene_pos}, next_mode={next_mode.name}") # Debug
         self._temp_drawing_points = [scene_pos]
         self._temp_line_item = QGraphicsLineItem(QLineF(scene_pos, scene_pos))
         self._temp_line_item.setPen(pen)
         self._temp_line_item.setZValue(PDF_Z_VALUE + 5) # Ensure visible above PDF for testing
         self.scene().addItem(self._temp_line_item)
-        print(f"[PdfViewer] Temporary line item added to scene: {self._temp_line_item}") # Debug
+        if DEBUG_VIEWER_VERBOSE: print(f"[PdfViewer] Temporary line item added to scene: {self._temp_line_item}") # Debug
         self.set_mode(next_mode)
         self.status_update.emit(f"{next_mode.name.replace('_END', '').replace('_', ' ').title()}: Click end point.", 0)
 
     def _finish_line_draw(self, scene_pos: QPointF, signal_emitter_func):
         if not self._temp_drawing_points:
-            print("[PdfViewer] _finish_line_draw: No temp drawing points, returning.") # Debug
+            if DEBUG_VIEWER_VERBOSE: print("[PdfViewer] _finish_line_draw: No temp drawing points, returning.") # Debug
             return
         p1 = self._temp_drawing_points[0]; p2 = scene_pos
-        print(f"[PdfViewer] _finish_line_draw: p1={p1}, p2={p2}. Emitting signal...") # Debug
+        if DEBUG_VIEWER_VERBOSE: print(f"[PdfViewer] _finish_line_draw: p1={p1}, p2={p2}. Emitting signal...") # Debug
         signal_emitter_func(p1, p2) # This is where scale_line_drawn.emit happens
-        print("[PdfViewer] Signal emitted.") # Debug
+        if DEBUG_VIEWER_VERBOSE: print("[PdfViewer] Signal emitted.") # Debug
         self._reset_temp_drawing_items()
         if self.current_mode == InteractionMode.SET_SCALE_END: self.set_mode(InteractionMode.IDLE)
         elif self.current_mode == InteractionMode.DEFINE_AISLE_LINE_END: self.set_mode(InteractionMode.DEFINE_AISLE_LINE_START)
@@ -370,7 +422,8 @@ class PdfViewer(QGraphicsView):
         # ... (rest of the method unchanged) ...
         is_closing = False
         if len(self._temp_drawing_points) > 2:
-            if QLineF(scene_pos, self._temp_drawing_points[0]).length() < OBSTACLE_SNAP_DISTANCE:
+            dx = scene_pos.x() - self._temp_snap_x; dy = scene_pos.y() - self._temp_snap_y
+            if dx * dx + dy * dy < OBSTACLE_SNAP_DISTANCE * OBSTACLE_SNAP_DISTANCE: # Squared distance, no QLineF/sqrt per click
                 is_closing = True; scene_pos = self._temp_drawing_points[0]
         status_msg_base = mode_type.name.replace('_', ' ').replace("DEFINE ", "").title()        
         
@@ -386,10 +439,15 @@ class PdfViewer(QGraphicsView):
                  self.status_update.emit(f"{status_msg_base} polygon completed. Draw another or cancel.", 0)
         else:
             self._temp_drawing_points.append(scene_pos); n = len(self._temp_drawing_points)
+            preview = self._temp_preview_polygon
+            if preview.isEmpty(): preview.append(scene_pos) # Placed point
+            else: preview[preview.size() - 1] = scene_pos # Cursor slot becomes the placed point
+            preview.append(scene_pos) # New cursor slot
             if n == 1:
-                self._temp_polygon_item = QGraphicsPolygonItem(QPolygonF(self._temp_drawing_points)); self._temp_polygon_item.setBrush(brush); self._temp_polygon_item.setPen(pen); self.scene().addItem(self._temp_polygon_item)
+                self._temp_snap_x = scene_pos.x(); self._temp_snap_y = scene_pos.y()
+                self._temp_polygon_item = QGraphicsPolygonItem(preview); self._temp_polygon_item.setBrush(brush); self._temp_polygon_item.setPen(pen); self.scene().addItem(self._temp_polygon_item)
                 self._temp_line_item = QGraphicsLineItem(); self._temp_line_item.setPen(pen); self.scene().addItem(self._temp_line_item)
-            elif self._temp_polygon_item: self._temp_polygon_item.setPolygon(QPolygonF(self._temp_drawing_points + [scene_pos] if n > 0 else [scene_pos])) 
+            elif self._temp_polygon_item: self._temp_polygon_item.setPolygon(preview)
             if self._temp_line_item and n > 1: self._temp_line_item.setLine(QLineF(self._temp_drawing_points[-1], scene_pos)) 
 
             self.status_update.emit(f"{mode_type.name.replace('_', ' ')}: Point {n} added. Click near start to close or Right-click/Esc to cancel.", 0)
@@ -412,13 +470,20 @@ class PdfViewer(QGraphicsView):
             self.rubber_band.setGeometry(QRectF(self.rubber_band_origin, event.pos()).normalized().toRect())
             super().mouseMoveEvent(event); return
 
+        if self._temp_drawing_points and (self._temp_line_item or self._temp_polygon_item):
+            self._pending_preview_pos = scene_pos # Coalesced: only the latest position is drawn when the timer fires
+            if not self._preview_update_timer.isActive(): self._preview_update_timer.start()
+        super().mouseMoveEvent(event)
+
+    def _flush_preview_update(self):
+        scene_pos = self._pending_preview_pos; self._pending_preview_pos = None
+        if scene_pos is None or not self._temp_drawing_points: return
         if self._temp_line_item and len(self._temp_drawing_points) == 1: self._temp_line_item.setLine(QLineF(self._temp_drawing_points[0], scene_pos))
-        elif self._temp_polygon_item and self._temp_drawing_points:
-            preview_poly_points = self._temp_drawing_points + [scene_pos]
-            self._temp_polygon_item.setPolygon(QPolygonF(preview_poly_points))
-            if len(self._temp_drawing_points) >= 1 and self._temp_line_item:
+        elif self._temp_polygon_item:
+            preview = self._temp_preview_polygon; preview[preview.size() - 1] = scene_pos # Move the cursor slot instead of rebuilding the polygon
+            self._temp_polygon_item.setPolygon(preview)
+            if self._temp_line_item:
                  self._temp_line_item.setLine(QLineF(self._temp_drawing_points[-1], scene_pos))
-        super().mouseMoveEvent(event)
 
     def mouseReleaseEvent(self, event: QMouseEvent):
         if self.current_mode == InteractionMode.PANNING and event.button() == Qt.MouseButton.MiddleButton:
@@ -491,6 +556,7 @@ class PdfViewer(QGraphicsView):
         item.setBrush(self._obstacle_brush)
         item.setPen(self._obstacle_pen)
         item.setZValue(OBSTACLES_Z_VALUE)
+        item.setData(0, {"kind": "obstacle", "uid": next(self._polygon_uid_gen)})
         item.setFlags(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable) # Default flags
         # Apply movable if currently in edit mode
         if self.current_mode == InteractionMode.EDIT:
@@ -502,12 +568,12 @@ class PdfViewer(QGraphicsView):
     def remove_obstacle_item(self, item_ref: QGraphicsPolygonItem):
         # ... (rest of the method unchanged) ...
         if item_ref in self._obstacle_items and item_ref.scene(): self.scene().removeItem(item_ref); self._obstacle_items.remove(item_ref)
-
     def add_staging_area_item(self, polygon: QPolygonF) -> QGraphicsPolygonItem:
         item = QGraphicsPolygonItem(polygon)
         item.setBrush(self._staging_area_brush)
         item.setPen(self._staging_area_pen)
         item.setZValue(STAGING_AREAS_Z_VALUE)
+        item.setData(0, {"kind": "staging", "uid": next(self._polygon_uid_gen)})
         item.setFlags(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable) # Default flags
         # Apply movable if currently in edit mode
         if self.current_mode == InteractionMode.EDIT:
@@ -578,19 +644,24 @@ class PdfViewer(QGraphicsView):
         self._path_item = None
 
     def clear_animation_overlay(self):
-        if self.animation_overlay_group:
-            # print(f"[PdfViewer clear_animation_overlay] Clearing {len(self.animation_overlay_group.childItems())} children from group.")
-            # This is a standard way to clear a group's children
-            for item in self.animation_overlay_group.childItems():
-                self.scene().removeItem(item) # Removing from scene also removes from group
-                # item.deleteLater() # Could be added if you suspect item leaks, but usually not needed
-        # else:
-        #     print("[PdfViewer clear_animation_overlay] Animation group is None, nothing to clear.")
+        # Pooled overlay items are only hidden so the next frame can reuse them without re-allocating
+        for item in self._animation_cart_pool: item.setVisible(False)
+        for item in self._animation_path_pool: item.setVisible(False)
+        self._animation_full_path_cache.clear() # Called when animation data is dropped or replaced
+
+    def _reset_animation_pools(self):
+        """Forgets pooled overlay items (called when the overlay group they belong to is replaced)."""
+        self._animation_cart_pool.clear(); self._animation_path_pool.clear(); self._animation_cart_rect = QRectF()
 
 
-    def update_animation_overlay(self, mode: AnimationMode, data: list):
+    def visible_scene_rect(self, margin_px: float = ANIMATION_CULL_MARGIN_PX) -> QRectF:
+        """Scene area currently shown in the viewport, grown by margin_px screen pixels (covers cart extents and pen width)."""
+        view_rect = self.viewport().rect().adjusted(-int(margin_px), -int(margin_px), int(margin_px), int(margin_px))
+        return self.mapToScene(view_rect).boundingRect()
+
+    def update_animation_overlay(self, mode: AnimationMode, data: Any):
+        # data: CARTS -> the cart frame dict of arrays (or empty); PATH_LINES -> list of per-path dicts
         # print(f"[PdfViewer update_animation_overlay] Called with mode: {mode}, data count: {len(data)}")
-        self.clear_animation_overlay() # Clear previous frame's items from the group
         if not self.animation_overlay_group:
             print("[PdfViewer update_animation_overlay] CRITICAL Error: Animation overlay group is None. Cannot draw.")
             return
@@ -603,10 +674,11 @@ class PdfViewer(QGraphicsView):
         # if data:
         #     print(f"[PdfViewer update_animation_overlay] Data for viewer: {data[0] if data else 'No data'}")
 
-        if mode == AnimationMode.CARTS:
-            self._draw_animation_carts(data)
-        elif mode == AnimationMode.PATH_LINES:
-            self._draw_animation_paths(data)
+        used_carts = self._draw_animation_carts(data) if mode == AnimationMode.CARTS else 0
+        used_paths = self._draw_animation_paths(data) if mode == AnimationMode.PATH_LINES else 0
+        # Hide pooled items not used by this frame
+        for item in self._animation_cart_pool[used_carts:]: item.setVisible(False)
+        for item in self._animation_path_pool[used_paths:]: item.setVisible(False)
         
         # Optional: Force an update of the group's bounding rect if items changed significantly
         # self.animation_overlay_group.prepareGeometryChange()
@@ -614,56 +686,83 @@ class PdfViewer(QGraphicsView):
 
     # ... (Keep _draw_animation_carts and _draw_animation_paths as debugged in the previous step)
 
-    def _draw_animation_carts(self, active_carts_data: list):
-        if not self.animation_overlay_group: return
-        if not active_carts_data: return # Added check
-        
-        for i, cart_data in enumerate(active_carts_data):
-            pos, angle, width_px, length_px = cart_data['pos'], cart_data['angle'], cart_data['width'], cart_data['length']
-            
-            if width_px <= 0.1 or length_px <= 0.1: # More lenient for small scales
-                if i < 2: print(f"  Skipping cart {i} due to zero/small size.")
-                continue
-
-            cart_rect = QGraphicsRectItem(-length_px / 2, -width_px / 2, length_px, width_px)
-            cart_rect.setBrush(QColor(255, 100, 0, 180)); cart_rect.setPen(Qt.PenStyle.NoPen)
-            cart_rect.setTransform(QTransform().translate(pos.x(), pos.y()).rotate(angle))
-            self.animation_overlay_group.addToGroup(cart_rect)
-
-
-    def _draw_animation_paths(self, active_paths_data: list):
-        if not self.animation_overlay_group: return
-        if not active_paths_data: return # Added check
-
-        if not hasattr(self, '_cluster_color_map'): self._cluster_color_map = {}
-        # ... (cluster_colors list)
-        cluster_colors = [QColor("blue"), QColor("red"), QColor("darkGreen"), QColor("purple"), QColor("orange"), QColor("teal"), QColor("maroon"), QColor("navy"), QColor("olive"), QColor("deeppink")]
-
-
+    def _draw_animation_carts(self, cart_frame: Optional[dict]) -> int:
+        """
+        Positions pooled cart items for this frame. cart_frame holds 'xy' ((K, 2) centres), 'angle' ((K,) degrees)
+        and the shared 'width'/'length' in pixels. Returns the number of pool items used.
+        """
+        if not self.animation_overlay_group: return 0
+        if not cart_frame: return 0 # No carts this frame
+
+        width_px, length_px = cart_frame['width'], cart_frame['length']
+        if width_px <= 0.1 or length_px <= 0.1: # More lenient for small scales
+            if DEBUG_ANIMATION_VERBOSE: print("  Skipping carts due to zero/small size.")
+            return 0
+        xy, angles = cart_frame['xy'], cart_frame['angle']
+        pool, group = self._animation_cart_pool, self.animation_overlay_group # Bound once for the per-cart loop
+
+        # All carts share one shape: only touch item rects when it changes (e.g. new scale or cart dimensions)
+        cart_shape = QRectF(-length_px / 2, -width_px / 2, length_px, width_px)
+        if cart_shape != self._animation_cart_rect:
+            for cart_rect in pool: cart_rect.setRect(cart_shape)
+            self._animation_cart_rect = cart_shape
+        while len(pool) < len(xy):
+            cart_rect = QGraphicsRectItem(cart_shape)
+            cart_rect.setBrush(self._animation_cart_brush); cart_rect.setPen(Qt.PenStyle.NoPen)
+            group.addToGroup(cart_rect); pool.append(cart_rect)
+
+        for cart_rect, (x, y), angle in zip(pool, xy.tolist(), angles.tolist()):
+            cart_rect.setTransform(QTransform().translate(x, y).rotate(angle))
+            cart_rect.setVisible(True)
+        return len(xy)
+
+
+    def _draw_animation_paths(self, active_paths_data: list) -> int:
+        """Updates pooled path items for this frame. Returns the number of pool items used."""
+        if not self.animation_overlay_group: return 0
+        if not active_paths_data: return 0 # Added check
+
+        cluster_colors, color_map, pens = self._animation_cluster_colors, self._cluster_color_map, self._animation_path_pens
+        pool, group, full_path_cache = self._animation_path_pool, self.animation_overlay_group, self._animation_full_path_cache
+
+        used = 0
         for i, path_data in enumerate(active_paths_data):
-            points, draw_prog, alpha, cluster = path_data['points'], path_data['draw_progress'], path_data['alpha'], path_data.get('start_cluster', "default")
+            # All four keys are always set by MainWindow._update_animation_frame, so index directly
+            points, draw_prog, alpha, cluster = path_data['points'], path_data['draw_progress'], path_data['alpha'], path_data['start_cluster']
 
             if not points or len(points) < 2 or alpha <= 0:
-                if i < 2: print(f"  Skipping path {i} due to no points/alpha.")
+                if DEBUG_ANIMATION_VERBOSE and i < 2: print(f"  Skipping path {i} due to no points/alpha.")
                 continue
 
             # ... (rest of path drawing logic) ...
-            if cluster not in self._cluster_color_map: self._cluster_color_map[cluster] = cluster_colors[len(self._cluster_color_map) % len(cluster_colors)]
-            path_color = self._cluster_color_map[cluster]
-            path_to_draw = QPainterPath(points[0])
+            if cluster not in color_map: color_map[cluster] = cluster_colors[len(color_map) % len(cluster_colors)]
             total_segments = len(points) - 1
-            if total_segments == 0: continue
-            length_to_draw_in_segments = draw_prog * total_segments
-            for seg_idx in range(total_segments):
-                current_segment_progress_val = length_to_draw_in_segments - seg_idx
-                if current_segment_progress_val <= 0: break
-                p_start, p_end = points[seg_idx], points[seg_idx+1]
-                if current_segment_progress_val >= 1.0: path_to_draw.lineTo(p_end)
-                else: path_to_draw.lineTo(p_start + (p_end - p_start) * current_segment_progress_val); break
-            path_item = QGraphicsPathItem(path_to_draw)
-            color_with_alpha = QColor(path_color); color_with_alpha.setAlpha(alpha)
-            pen = QPen(color_with_alpha, 2); pen.setCosmetic(True); path_item.setPen(pen)
-            self.animation_overlay_group.addToGroup(path_item)
+            if draw_prog >= 1.0: # Whole path: build once, reuse every later frame
+                cached = full_path_cache.get(id(points))
+                if cached is None:
+                    path_to_draw = QPainterPath(); path_to_draw.addPolygon(QPolygonF(points))
+                    full_path_cache[id(points)] = (points, path_to_draw)
+                else: path_to_draw = cached[1]
+            else: # Completed segments go in as one polygon (single C++ call), plus the interpolated tip of the current one
+                length_to_draw_in_segments = draw_prog * total_segments
+                full_segments = int(length_to_draw_in_segments); seg_frac = length_to_draw_in_segments - full_segments
+                drawn = QPolygonF(points[:full_segments + 1])
+                if seg_frac > 0:
+                    p_start, p_end = points[full_segments], points[full_segments + 1]
+                    drawn.append(p_start + (p_end - p_start) * seg_frac)
+                path_to_draw = QPainterPath(); path_to_draw.addPolygon(drawn)
+            if used == len(pool):
+                path_item = QGraphicsPathItem()
+                group.addToGroup(path_item); pool.append(path_item)
+            path_item = pool[used]; used += 1
+            path_item.setPath(path_to_draw)
+            pen = pens.get((cluster, alpha))
+            if pen is None:
+                color_with_alpha = QColor(color_map[cluster]); color_with_alpha.setAlpha(alpha)
+                pen = QPen(color_with_alpha, 2); pen.setCosmetic(True); pens[(cluster, alpha)] = pen
+            path_item.setPen(pen)
+            path_item.setVisible(True)
+        return used
         
 
 # --- END OF FILE Warehouse-Path-Finder-main/pdf_viewer.py ---
\ No newline at end of file
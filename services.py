@@ -2,21 +2,18 @@
 
 import json
 import math
+import os
+import hashlib
 import multiprocessing
 import time
 import csv
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Dict, List, NamedTuple, Tuple, Optional
 
 import numpy as np
-import pandas as pd
 from PySide6.QtCore import QObject, Signal, QPointF, QRectF
 from PySide6.QtGui import QPolygonF, QTransform
 
-# For debug grid visualization
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
-
 # Assuming model and pathfinding are in the same directory or accessible
 from model import WarehouseModel
 # Import pathfinding functions (adjust path if needed)
@@ -24,10 +21,41 @@ from pathfinding import (create_grid_from_obstacles, dijkstra_precompute,
                          reconstruct_path, COST_OBSTACLE,
                          OBSTACLE_DILATION_ITERATIONS, COST_EMPTY)
 
+# Precomputed grid/path maps are saved next to the project file so reopening an unchanged layout skips precomputation
+PATH_DATA_SIDECAR_SUFFIX = ".paths.npz"
+
+def _path_data_sidecar_path(project_file_path: str) -> str:
+    return os.path.splitext(project_file_path)[0] + PATH_DATA_SIDECAR_SUFFIX
+
+def _layout_fingerprint(model: WarehouseModel) -> str:
+    """Hash of every model input the pathfinding grid and maps depend on."""
+    bounds = model.pdf_bounds
+    user_bounds = model.user_pathfinding_bounds
+    key_data = {
+        "pdf_bounds": (bounds.x(), bounds.y(), bounds.width(), bounds.height()) if bounds else None,
+        "pixels_per_unit": model.scale_pixels_per_unit,
+        "grid_resolution_factor": model.grid_resolution_factor,
+        "staging_area_penalty": model.staging_area_penalty,
+        "obstacles": [[(p.x(), p.y()) for p in polygon] for polygon in model.obstacles],
+        "staging_areas": [[(p.x(), p.y()) for p in polygon] for polygon in model.staging_areas],
+        "user_pathfinding_bounds": [(p.x(), p.y()) for p in user_bounds] if user_bounds and not user_bounds.isEmpty() else None,
+        "pick_aisles": sorted((name, p.x(), p.y()) for name, p in model.pick_aisles.items()),
+        "staging_locations": sorted((name, p.x(), p.y()) for name, p in model.staging_locations.items()),
+    }
+    return hashlib.sha1(json.dumps(key_data).encode("utf-8")).hexdigest()
+
 # --- Worker function for multiprocessing (needs to be top-level) ---
-def _run_dijkstra_worker(args: Tuple[np.ndarray, Tuple[int, int], str]) -> Tuple[str, Optional[np.ndarray], Optional[np.ndarray]]:
+_worker_grid: Optional[np.ndarray] = None # Cost grid shared by every task of a pool process, sent once via _init_dijkstra_worker
+
+def _init_dijkstra_worker(grid: np.ndarray):
+    """Pool initializer: receives the grid once per process instead of pickling it into every task."""
+    global _worker_grid
+    _worker_grid = grid
+
+def _run_dijkstra_worker(args: Tuple[Tuple[int, int], str]) -> Tuple[str, Optional[np.ndarray], Optional[np.ndarray]]:
     """Worker function for parallel Dijkstra precomputation."""
-    grid, start_cell, start_name = args
+    start_cell, start_name = args
+    grid = _worker_grid
     try:
         if grid[start_cell] == COST_OBSTACLE:
             # print(f"[Worker] Skipping precomputation for '{start_name}': Start point is inside obstacle at cell {start_cell}.") # Keep commented unless debugging worker
@@ -84,6 +112,7 @@ class ProjectService(QObject):
             with open(file_path, 'w') as f:
                 json.dump(project_data, f, indent=4)
             print("[ProjectService] Project saved successfully.")
+            self._save_path_data(model, file_path)
             self.project_operation_finished.emit(f"Project saved to {file_path}")
             return True
         except Exception as e:
@@ -141,6 +170,7 @@ class ProjectService(QObject):
 
             print("[ProjectService] Project data loaded successfully.")
             model.mark_project_loaded()
+            self._load_path_data(model, file_path)
             self.project_operation_finished.emit(f"Project '{model.current_project_path}' loaded.")
             return model
 
@@ -153,6 +183,48 @@ class ProjectService(QObject):
             return None
 
 
+    def _save_path_data(self, model: WarehouseModel, file_path: str):
+        """Writes precomputed grid/path maps to the project's sidecar file. Failures only cost a recompute later."""
+        sidecar_path = _path_data_sidecar_path(file_path)
+        try:
+            if not model.path_data_is_valid or not model.path_maps:
+                if os.path.exists(sidecar_path): os.remove(sidecar_path) # Don't leave maps from an older layout behind
+                return
+            names = sorted(model.path_maps.keys())
+            arrays = {"grid": model.pathfinding_grid,
+                      "grid_origin": np.array([model.grid_origin_pdf.x(), model.grid_origin_pdf.y()]),
+                      "fingerprint": np.array(_layout_fingerprint(model)),
+                      "names": np.array(names)}
+            for i, name in enumerate(names): # Index keys: point names may contain characters npz keys can't
+                arrays[f"dist_{i}"] = model.distance_maps[name]; arrays[f"path_{i}"] = model.path_maps[name]
+            np.savez_compressed(sidecar_path, **arrays)
+            print(f"[ProjectService] Saved path data for {len(names)} points to: {sidecar_path}")
+        except Exception as e:
+            print(f"[ProjectService] Warning: Could not save path data: {e}")
+
+    def _load_path_data(self, model: WarehouseModel, file_path: str):
+        """Restores precomputed grid/path maps if the sidecar matches the loaded layout."""
+        sidecar_path = _path_data_sidecar_path(file_path)
+        if not os.path.exists(sidecar_path): return
+        try:
+            with np.load(sidecar_path, allow_pickle=False) as data:
+                if str(data["fingerprint"]) != _layout_fingerprint(model):
+                    print("[ProjectService] Path data on disk is for a different layout, ignoring it.")
+                    return
+                names = [str(n) for n in data["names"]]
+                grid = data["grid"] # NpzFile decompresses on every key access; read once
+                distance_maps = {name: data[f"dist_{i}"] for i, name in enumerate(names)}
+                path_maps = {name: data[f"path_{i}"] for i, name in enumerate(names)}
+                if any(m.shape != grid.shape for m in path_maps.values()): # Predecessors are flat indices, one per grid cell
+                    print("[ProjectService] Path data on disk has an unexpected layout, ignoring it.")
+                    return
+                origin_x, origin_y = data["grid_origin"]
+                model.set_pathfinding_data(grid, QPointF(float(origin_x), float(origin_y)), distance_maps, path_maps)
+            print(f"[ProjectService] Restored path data for {len(names)} points from: {sidecar_path}")
+        except Exception as e:
+            print(f"[ProjectService] Warning: Could not load path data, it will be recomputed: {e}")
+
+
 class PathfindingService(QObject):
     grid_update_started = Signal()
     grid_update_finished = Signal(bool)
@@ -306,23 +378,25 @@ class PathfindingService(QObject):
         tasks, valid_start_names, initial_failed_points = [], [], []
         debug_pick_aisle_cells: List[Tuple[int, int]] = []
 
-        for name, point_pdf in start_points_pdf_coords.items():
-            col_raw = (point_pdf.x() - grid_origin.x()) / res_f
-            row_raw = (point_pdf.y() - grid_origin.y()) / res_f
-            
-            col_clamped = max(0, min(int(col_raw), grid_w - 1))
-            row_clamped = max(0, min(int(row_raw), grid_h - 1))
-            start_cell = (row_clamped, col_clamped)
+        # Map all pick aisles to grid cells in one vectorized pass (astype truncates toward zero like int())
+        start_names, start_xy = model.pick_aisle_coords
+        raw_cols = (start_xy[:, 0] - grid_origin.x()) / res_f
+        raw_rows = (start_xy[:, 1] - grid_origin.y()) / res_f
+        cols_clamped = np.clip(raw_cols.astype(np.int64), 0, grid_w - 1)
+        rows_clamped = np.clip(raw_rows.astype(np.int64), 0, grid_h - 1)
+
+        for i, name in enumerate(start_names):
+            start_cell = (int(rows_clamped[i]), int(cols_clamped[i]))
             debug_pick_aisle_cells.append(start_cell)
 
             if len(debug_pick_aisle_cells) <= 5 or name.startswith("A1") or name.startswith("D1"):
-                print(f"[Service DEBUG] Pick Aisle '{name}': PDF ({point_pdf.x():.2f}, {point_pdf.y():.2f}) "
-                      f"-> Grid Cell (Raw float: {row_raw:.2f},{col_raw:.2f}; Clamped int: {row_clamped},{col_clamped})")
+                print(f"[Service DEBUG] Pick Aisle '{name}': PDF ({start_xy[i, 0]:.2f}, {start_xy[i, 1]:.2f}) "
+                      f"-> Grid Cell (Raw float: {raw_rows[i]:.2f},{raw_cols[i]:.2f}; Clamped int: {start_cell[0]},{start_cell[1]})")
 
             if grid[start_cell] == COST_OBSTACLE:
                 initial_failed_points.append(f"{name} (in obstacle at grid cell {start_cell})")
             else:
-                tasks.append((grid, start_cell, name))
+                tasks.append((start_cell, name))
                 valid_start_names.append(name)
         
         # print(f"[Service DEBUG] Saving debug grid with pick aisle cell locations (count: {len(debug_pick_aisle_cells)})...") # Keep commented unless needed
@@ -340,7 +414,7 @@ class PathfindingService(QObject):
         try:
             num_workers = max(1, multiprocessing.cpu_count() - 1 if multiprocessing.cpu_count() > 1 else 1)
             chunksize = max(1, len(tasks) // num_workers if num_workers > 0 else 1)
-            with multiprocessing.Pool(processes=num_workers) as pool:
+            with multiprocessing.Pool(processes=num_workers, initializer=_init_dijkstra_worker, initargs=(grid,)) as pool:
                  for name_mp, dist_map, path_map in pool.imap_unordered(_run_dijkstra_worker, tasks, chunksize=chunksize):
                     if dist_map is not None and path_map is not None:
                         results_dist[name_mp] = dist_map; results_path[name_mp] = path_map; successful_count += 1
@@ -348,7 +422,6 @@ class PathfindingService(QObject):
                     elif name_mp in valid_start_names: 
                         if not any(name_mp in f_item for f_item in final_failed_points_combined):
                              final_failed_points_combined.append(f"{name_mp} (failed during Dijkstra worker)")
-                    QObject().thread().msleep(10)
             
             model.set_pathfinding_data(grid, grid_origin, results_dist, results_path)
             duration = time.time() - start_time; success_flag = not bool(final_failed_points_combined)
@@ -418,6 +491,9 @@ class PathfindingService(QObject):
         if model.pathfinding_grid is None:
             print("[PathfindingService Debug] Grid is None, cannot save.")
             return
+        # Debug-only; pyplot is imported here so it does not add to application startup
+        import matplotlib.pyplot as plt
+        import matplotlib.colors as mcolors
 
         grid_data = model.pathfinding_grid
         viz_grid = np.zeros_like(grid_data, dtype=float)
@@ -501,7 +577,7 @@ class AnalysisService(QObject):
                         e_t_str=row_data[end_t_idx].strip() if end_t_idx >= 0 else ""
                         
                         p_dt=self._parse_flexible_datetime(s_t_str)
-                        if p_dt: p_date_str=p_dt.strftime("%Y-%m-%d")
+                        if p_dt: p_date_str=p_dt.date().isoformat() # Same "YYYY-MM-DD" as strftime, without locale-aware formatting
                         elif s_t_str and start_t_idx >=0 :
                             stat='DateParseErr'; warnings_list.append(f"R{row_num}({p_id}):Bad StartTime '{s_t_str}'")
                         
@@ -537,12 +613,24 @@ class AnalysisService(QObject):
                 w = csv.writer(f); w.writerow(hdr)
                 for r_d in results:
                     d = r_d.get('distance'); status_val = r_d.get('status', "ERROR/SKIPPED")
-                    d_s = f"{d:.2f}" if pd.notna(d) and d!=np.inf else status_val.upper()
+                    d_s = f"{d:.2f}" if d is not None and np.isfinite(d) else status_val.upper()
                     w.writerow([r_d.get(k, '') for k in ['id','start','end']] + [d_s] + [status_val, r_d.get('date',''), r_d.get('start_time',''), r_d.get('end_time','')])
             self.export_complete.emit(file_path)
         except Exception as e: self.export_failed.emit(f"Export failed: {e}")
 
 
+class AnimationItem(NamedTuple):
+    """One validated picklist row ready to animate; a slotted tuple instead of a dict, since thousands are kept per run."""
+    id: str
+    start_name: str
+    end_name: str
+    start_time_s: float # Seconds since the earliest start_dt of the run
+    end_time_s: float
+    start_dt: datetime
+    end_dt: datetime
+    path_points: List[QPointF]
+
+
 class AnimationService(QObject):
     preparation_started = Signal(str)
     preparation_complete = Signal(list, datetime)
@@ -621,8 +709,8 @@ class AnimationService(QObject):
                 pts, _ = path_svc.get_shortest_path(model, s_name, e_name)
                 if pts is None: 
                     warnings_list.append(f"R{r_num}({p_id}): No path found for {s_name}->{e_name}"); continue
-                anim_data.append({'id':p_id,'start_name':s_name,'end_name':e_name,'start_time_s':s_time_s,'end_time_s':e_time_s,
-                                     'start_dt':s_dt,'end_dt':e_dt,'path_points':pts})
+                # Every emitted item has all fields set to valid values; MainWindow relies on that and skips re-checking
+                anim_data.append(AnimationItem(p_id, s_name, e_name, s_time_s, e_time_s, s_dt, e_dt, pts))
             except Exception as e: warnings_list.append(f"R{r_num}({p_id}) (Path/Time Calc): {e}")
 
         if not anim_data: 